@@ -2,15 +2,29 @@ import math
 import sys
 import os
 import json
+import time
 import numpy as np
 import pygame
 from pygame.locals import *
 from OpenGL.GL import *
 from OpenGL.GLU import *
+from collatz_sphere_cache import AttributeCache, changed_stages
+from collatz_bitpatterns import PatternScaler
+from collatz_culling import SphereTiles, gl_rotation_matrix, object_space_eye
+
+# Pattern-based adjustments to the mapped numbers, applied in this order
+PATTERN_ADJUSTMENTS = PatternScaler({
+    '101': 1.1,    # L-type harbor pattern
+    '111': 0.9,    # Mersenne-like pattern
+    '1010': 1.05,  # Alternating pattern
+})
 
 class CollatzSphereVisualizer:
     def __init__(self, config_path='collatz_sphere_config.json'):
         # Load configuration
+        self.config_path = config_path
+        self.config_mtime = self._config_mtime()
+        self.last_config_check = time.time()
         try:
             with open(config_path, 'r') as config_file:
                 self.config = json.load(config_file)
@@ -24,6 +38,7 @@ class CollatzSphereVisualizer:
                 "camera": {
                     "initial_position": [0, 0, -10],
                     "initial_rotation": [30, 0, 0],
+                    "cull_hidden": False,
                     "auto_rotate": {
                         "enabled": False,
                         "speed_x": 0.5,
@@ -40,10 +55,42 @@ class CollatzSphereVisualizer:
             }
         
         # Initialize visualization parameters
+        self._read_point_settings()
+        self._read_color_settings()
+        self._read_view_settings()
+        
+        # Collatz attributes per point are cached on disk by resolution/scale/max_iterations,
+        # colors are derived from them so a color edit never recomputes numbers
+        self.attribute_cache = AttributeCache(self.config.get('cache_dir', '.collatz_cache'), 'sphere_attributes')
+        
+        # Performance optimization
+        self.cache = {}
+        self.attributes = None
+        self.points = None
+        self.colors = None
+        
+        # Vertex buffers for points and colors, re-uploaded only when the point set changes
+        self.point_buffers = None
+        self.buffer_point_count = 0
+        self.buffers_dirty = set()
+        
+        # Direction tiles of the current point set when hidden-point culling is on;
+        # the buffers then hold the points in tile order
+        self.tiles = None
+        
+        # Pygame and OpenGL setup
+        pygame.init()
+        display = (self.config.get('width', 1280), self.config.get('height', 1280))
+        pygame.display.set_mode(display, DOUBLEBUF | OPENGL)
+        pygame.display.set_caption("Collatz 3D Sphere Visualization")
+
+    def _read_point_settings(self):
+        """Settings that change which numbers the points map to"""
         self.scale = self.config.get('scale', 40.0)
         self.max_iterations = self.config['max_iterations']
         self.resolution = self.config['resolution']
-        
+
+    def _read_color_settings(self):
         # Color mapping parameters
         self.color_params = self.config.get('color', {
             'max_power_norm': 64.0,
@@ -52,10 +99,17 @@ class CollatzSphereVisualizer:
             'z_weight': 0.5,
             'step_weight': 1.0
         })
-        
+
+    @staticmethod
+    def _initial_camera(config):
+        """Configured (position, rotation) the camera starts from"""
+        camera = config.get('camera', {})
+        return (list(camera.get('initial_position', [0, 0, -10])),
+                list(camera.get('initial_rotation', [30, 0, 0])))
+
+    def _read_view_settings(self):
         # Camera settings
-        self.camera_pos = self.config['camera'].get('initial_position', [0, 0, -10])
-        self.rotation = self.config['camera'].get('initial_rotation', [30, 0, 0])
+        self.camera_pos, self.rotation = self._initial_camera(self.config)
         
         # Auto-rotation settings
         auto_rotate = self.config['camera'].get('auto_rotate', {})
@@ -65,16 +119,54 @@ class CollatzSphereVisualizer:
             auto_rotate.get('speed_y', 0.5)
         ]
         
-        # Performance optimization
-        self.cache = {}
-        self.points = None
-        self.colors = None
+        # Skip the tiles of points facing away from the camera
+        self.cull_hidden = self.config['camera'].get('cull_hidden', False)
+
+    def _config_mtime(self):
+        try:
+            return os.stat(self.config_path).st_mtime
+        except OSError:
+            return None
+
+    def reload_config(self):
+        """Apply edits to the config file, redoing only the stages they invalidate"""
+        mtime = self._config_mtime()
+        if mtime is None or mtime == self.config_mtime:
+            return
+        self.config_mtime = mtime
         
-        # Pygame and OpenGL setup
-        pygame.init()
-        display = (self.config.get('width', 1280), self.config.get('height', 1280))
-        pygame.display.set_mode(display, DOUBLEBUF | OPENGL)
-        pygame.display.set_caption("Collatz 3D Sphere Visualization")
+        try:
+            with open(self.config_path, 'r') as config_file:
+                new_config = json.load(config_file)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Config reload skipped: {e}")
+            return
+        
+        stages = changed_stages(self.config, new_config)
+        if not stages:
+            return
+        old_config = self.config
+        self.config = new_config
+        print(f"Config changed, updating: {', '.join(sorted(stages))}")
+        
+        if 'view' in stages:
+            cull_hidden = self.cull_hidden
+            camera = (self.camera_pos, self.rotation)
+            self._read_view_settings()
+            # Keep where the user moved the camera unless its initial placement was edited
+            if self._initial_camera(old_config) == self._initial_camera(new_config):
+                self.camera_pos, self.rotation = camera
+            if self.cull_hidden != cull_hidden and 'points' not in stages:
+                self.update_colors(points_changed=True)
+            if (new_config.get('width'), new_config.get('height')) != pygame.display.get_surface().get_size():
+                print("Window size changes apply on restart")
+        if 'points' in stages:
+            self._read_point_settings()
+            self.cache = {}  # Stopping times depend on max_iterations
+            self.attributes = self.load_attributes()
+        if 'colors' in stages:
+            self._read_color_settings()
+            self.update_colors(points_changed='points' in stages)
 
     def is_power_of_two(self, n):
         return n > 0 and (n & (n - 1)) == 0
@@ -117,87 +209,160 @@ class CollatzSphereVisualizer:
         self.cache[n] = result
         return result
 
-    def get_color(self, result, z_coord):
-        if not result or not result['converged']:
-            return (0.2, 0.2, 0.2)
-            
-        # Normalize values
-        steps_norm = min(1.0, result['steps'] / self.max_iterations)
-        value_norm = min(1.0, math.log2(result['max_value']) / self.color_params['max_value_norm'])
-        z_norm = (z_coord + 1) / 2
+    def generate_attributes(self):
+        """Converged sphere points and their Collatz attributes, vectorized over the grid"""
+        thetas = np.arange(0, 2*np.pi, self.resolution)
+        phis = np.arange(0, np.pi, self.resolution)
+        print(f"Generating points on a {len(thetas)}x{len(phis)} grid...")
+        
+        # Trig per grid line with math, so positions match the scalar formulas bit for bit
+        sin_theta = np.array([math.sin(t) for t in thetas])
+        cos_theta = np.array([math.cos(t) for t in thetas])
+        sin_phi = np.array([math.sin(p) for p in phis])
+        cos_phi = np.array([math.cos(p) for p in phis])
+        
+        # Theta is the outer loop, phi the inner one
+        x = (sin_phi[None, :] * cos_theta[:, None]).ravel()
+        y = (sin_phi[None, :] * sin_theta[:, None]).ravel()
+        z = np.broadcast_to(cos_phi, (len(thetas), len(phis))).ravel()
+        
+        # The number only depends on the radius, which takes very few distinct values,
+        # so the Collatz work is done once per distinct radius
+        radii, inverse = np.unique(np.sqrt(x*x + y*y + z*z), return_inverse=True)
+        inverse = inverse.ravel()
+        results = [self.calculate_stopping_time(self._map_radius_to_number(r)) for r in radii]
         
-        # Default coloring
-        return (
+        converged = np.array([bool(result and result['converged']) for result in results])
+        steps = np.array([result['steps'] if result else 0 for result in results], dtype=np.float64)
+        log_max_value = np.array([math.log2(result['max_value']) if result else 0.0 for result in results])
+        
+        keep = converged[inverse]
+        print(f"Point generation complete! {keep.sum()}/{len(x)} points converged "
+              f"({len(radii)} distinct numbers)")
+        return {
+            'positions': np.column_stack((x[keep], y[keep], z[keep])),
+            'steps': steps[inverse[keep]],
+            'log_max_value': log_max_value[inverse[keep]]
+        }
+
+    def point_settings(self):
+        return {'resolution': self.resolution, 'scale': self.scale, 'max_iterations': self.max_iterations}
+
+    def load_attributes(self):
+        """Point attributes from the on-disk cache, generated on a miss"""
+        attributes = self.attribute_cache.load(self.point_settings())
+        if attributes is not None:
+            print(f"Loaded cached points from {self.attribute_cache.path(self.point_settings())}")
+            return attributes
+        
+        attributes = self.generate_attributes()
+        self.attribute_cache.save(self.point_settings(), **attributes)
+        return attributes
+
+    def get_colors(self, attributes):
+        """Colors of the converged points in attributes"""
+        steps_norm = np.minimum(1.0, attributes['steps'] / self.max_iterations)
+        value_norm = np.minimum(1.0, attributes['log_max_value'] / self.color_params['max_value_norm'])
+        z_norm = (attributes['positions'][:, 2] + 1) / 2
+        
+        return np.column_stack((
             steps_norm,
             value_norm * 0.5 + z_norm * 0.5,
             (1.0 - steps_norm) * z_norm
-        )
+        )).astype(np.float32)
 
-    def generate_points(self):
-        points = []
-        colors = []
-        
-        print("Generating points...")
-        total_points = int((2 * np.pi / self.resolution) * (np.pi / self.resolution))
-        points_generated = 0
-        
-        for theta in np.arange(0, 2*np.pi, self.resolution):
-            for phi in np.arange(0, np.pi, self.resolution):
-                x = math.sin(phi) * math.cos(theta)
-                y = math.sin(phi) * math.sin(theta)
-                z = math.cos(phi)
-                
-                # Map spherical coordinates to a number
-                n = self._map_to_number(x, y, z)
-                result = self.calculate_stopping_time(n)
-                color = self.get_color(result, z_coord=z)
-                
-                if result and result['converged']:
-                    points.append((x, y, z))
-                    colors.append(color)
-                
-                points_generated += 1
-                if points_generated % 1000 == 0:
-                    print(f"Progress: {points_generated}/{total_points} points ({(points_generated/total_points)*100:.1f}%)")
-        
-        print("Point generation complete!")
-        return np.array(points, dtype=np.float32), np.array(colors, dtype=np.float32)
+    def update_colors(self, points_changed=False):
+        """Recolor from the current attributes; positions are only re-uploaded if they changed"""
+        colors = self.get_colors(self.attributes)
+        if points_changed:
+            self.set_points(self.attributes['positions'], colors)
+        else:
+            self.set_colors(colors)
 
-    def _map_to_number(self, x, y, z):
-        r = math.sqrt(x*x + y*y + z*z)
-        
+    def _map_radius_to_number(self, r):
         # Base mapping with some variation
         base_number = int(r * math.pow(2, self.scale))
         
-        # Optional: Add some pattern-based adjustments
-        patterns = {
-            '101': 1.1,    # L-type harbor pattern
-            '111': 0.9,    # Mersenne-like pattern
-            '1010': 1.05,  # Alternating pattern
-        }
-        
         # Apply pattern-based adjustments
-        for pattern, factor in patterns.items():
-            if self._has_bit_pattern(base_number, pattern):
-                base_number = int(base_number * factor)
+        base_number = PATTERN_ADJUSTMENTS.apply(base_number)
         
         return max(1, base_number)
 
-    def _has_bit_pattern(self, n, pattern):
-        """Check if number contains specific binary pattern."""
-        bin_str = bin(n)[2:]  # Convert to binary, remove '0b' prefix
-        return pattern in bin_str
-
     def init_gl(self):
         glEnable(GL_DEPTH_TEST)
         glEnable(GL_POINT_SMOOTH)
         glPointSize(2.0)
         
-        print("Generating points...")
-        self.points, self.colors = self.generate_points()
+        print("Preparing points...")
+        self.attributes = self.load_attributes()
+        self.update_colors(points_changed=True)
         print(f"Generated {len(self.points)} points")
 
+    def set_points(self, points, colors):
+        """Replace the rendered point set; it is uploaded to the GPU on the next frame"""
+        self.tiles = SphereTiles(points) if self.cull_hidden else None
+        order = self.tiles.order if self.tiles is not None else slice(None)
+        self.points = np.ascontiguousarray(points[order], dtype=np.float32)
+        self.colors = np.ascontiguousarray(colors[order], dtype=np.float32)
+        self.buffers_dirty = {'points', 'colors'}
+
+    def set_colors(self, colors):
+        """Replace only the colors of the current point set"""
+        order = self.tiles.order if self.tiles is not None else slice(None)
+        self.colors = np.ascontiguousarray(colors[order], dtype=np.float32)
+        self.buffers_dirty = self.buffers_dirty | {'colors'}
+
+    def upload_point_buffers(self):
+        """Copy the changed points and/or colors into the vertex buffers"""
+        if self.point_buffers is None:
+            self.point_buffers = glGenBuffers(2)
+        
+        if 'points' in self.buffers_dirty:
+            glBindBuffer(GL_ARRAY_BUFFER, self.point_buffers[0])
+            glBufferData(GL_ARRAY_BUFFER, self.points.nbytes, self.points, GL_STATIC_DRAW)
+        if 'colors' in self.buffers_dirty:
+            glBindBuffer(GL_ARRAY_BUFFER, self.point_buffers[1])
+            glBufferData(GL_ARRAY_BUFFER, self.colors.nbytes, self.colors, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        
+        self.buffer_point_count = len(self.points)
+        self.buffers_dirty = set()
+
+    def camera_eye(self):
+        """Camera position in the points' coordinates, for the transform set up in display"""
+        rotation = (gl_rotation_matrix(self.rotation[0], (1, 0, 0)) @
+                    gl_rotation_matrix(self.rotation[1], (0, 1, 0)) @
+                    gl_rotation_matrix(self.rotation[2], (0, 0, 1)))
+        return object_space_eye(rotation, self.camera_pos)
+
+    def draw_point_buffers(self):
+        """Draw every point with a single glDrawArrays call, or the visible tiles with one glMultiDrawArrays"""
+        if self.buffer_point_count == 0:
+            return
+        
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        
+        glBindBuffer(GL_ARRAY_BUFFER, self.point_buffers[0])
+        glVertexPointer(3, GL_FLOAT, 0, None)
+        glBindBuffer(GL_ARRAY_BUFFER, self.point_buffers[1])
+        glColorPointer(3, GL_FLOAT, 0, None)
+        
+        if self.tiles is not None:
+            firsts, counts = self.tiles.visible_ranges(self.camera_eye())
+            if len(firsts):
+                glMultiDrawArrays(GL_POINTS, firsts, counts, len(firsts))
+        else:
+            glDrawArrays(GL_POINTS, 0, self.buffer_point_count)
+        
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
     def display(self):
+        if self.buffers_dirty:
+            self.upload_point_buffers()
+        
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
         glLoadIdentity()
         
@@ -209,12 +374,8 @@ class CollatzSphereVisualizer:
         glRotatef(self.rotation[1], 0, 1, 0)  # Yaw
         glRotatef(self.rotation[2], 0, 0, 1)  # Roll
         
-        # Render points
-        glBegin(GL_POINTS)
-        for point, color in zip(self.points, self.colors):
-            glColor3fv(color)
-            glVertex3fv(point)
-        glEnd()
+        # Render points from the vertex buffers
+        self.draw_point_buffers()
         
         pygame.display.flip()
 
@@ -236,8 +397,10 @@ class CollatzSphereVisualizer:
         print("  Arrow keys: Rotate")
         print("  Page Up/Down: Zoom in/out")
         print("  A: Toggle auto-rotation")
+        print("  H: Toggle hidden-point culling (faster, drops back-side points seen through gaps)")
         print("  R: Reset view")
         print("  Q or ESC: Quit")
+        print(f"  Edits to {self.config_path} are applied live")
         
         clock = pygame.time.Clock()
         running = True
@@ -252,14 +415,19 @@ class CollatzSphereVisualizer:
                         running = False
                     elif event.key == pygame.K_r:
                         # Reset to initial configuration
-                        self.camera_pos = self.config['camera'].get('initial_position', [0, 0, -10])
-                        self.rotation = self.config['camera'].get('initial_rotation', [30, 0, 0])
+                        self.camera_pos = list(self.config['camera'].get('initial_position', [0, 0, -10]))
+                        self.rotation = list(self.config['camera'].get('initial_rotation', [30, 0, 0]))
                     elif event.key == pygame.K_PAGEUP:
                         self.camera_pos[2] += 1
                     elif event.key == pygame.K_PAGEDOWN:
                         self.camera_pos[2] -= 1
                     elif event.key == pygame.K_a:
                         self.auto_rotate = not self.auto_rotate
+                    elif event.key == pygame.K_h:
+                        self.cull_hidden = not self.cull_hidden
+                        self.update_colors(points_changed=True)
+                        print(f"Hidden-point culling: {'ON' if self.cull_hidden else 'OFF'}"
+                              + (" (back-side points seen through gaps are not drawn)" if self.cull_hidden else ""))
             
             # Handle rotation
             if self.auto_rotate:
@@ -276,9 +444,16 @@ class CollatzSphereVisualizer:
                 if keys[pygame.K_DOWN]:
                     self.rotation[0] += 2
             
+            # Pick up config edits about once a second
+            if time.time() - self.last_config_check >= 1.0:
+                self.last_config_check = time.time()
+                self.reload_config()
+            
             self.display()
             clock.tick(60)
         
+        if self.point_buffers is not None:
+            glDeleteBuffers(2, self.point_buffers)
         pygame.quit()
 
 def create_default_config():
@@ -292,6 +467,7 @@ def create_default_config():
         "camera": {
             "initial_position": [0, 0, -10],
             "initial_rotation": [30, 0, 0],
+            "cull_hidden": False,
             "auto_rotate": {
                 "enabled": False,
                 "speed_x": 0.5,
@@ -3,19 +3,28 @@ import sys
 import os
 import json
 import numpy as np
-import pygame
-from pygame.locals import *
-from OpenGL.GL import *
-from OpenGL.GLU import *
+try:
+    import pygame
+    from pygame.locals import *
+    from OpenGL.GL import *
+    from OpenGL.GLU import *
+except ImportError:
+    # Only the 'gl' render backend needs pygame and OpenGL
+    pygame = None
 import multiprocessing
-from multiprocessing import shared_memory, Manager, Lock
+from multiprocessing import shared_memory, util
+import threading
 import traceback
-import gc
 import atexit
 import signal
 import time
 import logging
+import hashlib
 import psutil
+from collatz_frames import AsyncFrameWriter, FrameManifest, FRAME_FORMATS
+from collatz_sphere_cache import AttributeCache
+from collatz_bitpatterns import PatternScaler
+from collatz_culling import SphereTiles, gl_rotation_matrix, object_space_eye
 
 # Configure logging
 logging.basicConfig(
@@ -25,33 +34,100 @@ logging.basicConfig(
 )
 logger = logging.getLogger('collatz_sphere_renderer')
 
-class FrameTracker:
-    """Class to track progress of frame rendering across processes"""
-    def __init__(self, total_frames, manager):
-        self.completed = manager.Value('i', 0)
-        self.failed = manager.Value('i', 0)
+# Per-process render state, filled by CollatzSphereRenderer.init_render_worker
+_worker_state = {}
+
+# Pattern-based adjustments to the mapped numbers, applied in this order
+PATTERN_ADJUSTMENTS = PatternScaler({
+    '101': 1.1,    # L-type harbor pattern
+    '111': 0.9,    # Mersenne-like pattern
+    '1010': 1.05,  # Alternating pattern
+})
+
+class RenderProgress:
+    """
+    Progress tracking for frame rendering across processes.
+    Workers put small event tuples on a multiprocessing queue, which hands them to
+    a feeder thread, so reporting never waits on the parent. A consumer thread in
+    the parent keeps the counters and reports throughput, ETA and per-worker stats.
+    """
+    def __init__(self, total_frames, report_interval=2):
         self.total = total_frames
-        self.lock = manager.Lock()
-        self.last_report_time = time.time()
-        self.report_interval = 2  # seconds
-        
-    def mark_complete(self):
-        with self.lock:
-            self.completed.value += 1
-            self._report_progress()
-    
-    def mark_failed(self):
-        with self.lock:
-            self.failed.value += 1
-            self._report_progress()
-    
-    def _report_progress(self):
-        # Only report progress at intervals to reduce console spam
-        current_time = time.time()
-        if current_time - self.last_report_time >= self.report_interval:
-            self.last_report_time = current_time
-            progress = (self.completed.value / self.total) * 100
-            logger.info(f"Progress: {self.completed.value}/{self.total} frames completed ({progress:.1f}%), {self.failed.value} failed")
+        self.completed = 0
+        self.failed = 0
+        self.report_interval = report_interval  # seconds
+        self.queue = multiprocessing.Queue()
+        self.workers = {}
+        self.start_time = None
+        self.last_report_time = None
+        self._consumer = None
+    
+    @staticmethod
+    def frame_done(progress_queue, frame, render_time, write_time):
+        """Worker side: a frame has been rendered and written"""
+        progress_queue.put(('done', frame, os.getpid(), render_time, write_time))
+    
+    @staticmethod
+    def frame_failed(progress_queue, frame):
+        """Worker side: a frame could not be rendered or written"""
+        progress_queue.put(('failed', frame, os.getpid(), 0.0, 0.0))
+    
+    def start(self):
+        self.start_time = self.last_report_time = time.time()
+        self._consumer = threading.Thread(target=self._consume, name='render-progress', daemon=True)
+        self._consumer.start()
+    
+    def stop(self):
+        """Wait until every event sent before this call has been counted"""
+        self.queue.put(None)
+        self._consumer.join()
+        self.queue.close()
+    
+    def _consume(self):
+        while True:
+            event = self.queue.get()
+            if event is None:
+                return
+            
+            status, frame, pid, render_time, write_time = event
+            stats = self.workers.setdefault(pid, {'frames': 0, 'failed': 0, 'render_time': 0.0, 'write_time': 0.0})
+            if status == 'done':
+                self.completed += 1
+                stats['frames'] += 1
+                stats['render_time'] += render_time
+                stats['write_time'] += write_time
+            else:
+                self.failed += 1
+                stats['failed'] += 1
+            
+            # Only report progress at intervals to reduce console spam
+            current_time = time.time()
+            if current_time - self.last_report_time >= self.report_interval:
+                self.last_report_time = current_time
+                self._report_progress(current_time)
+    
+    def throughput(self, current_time=None):
+        """Completed frames per second since start"""
+        elapsed = (current_time or time.time()) - self.start_time
+        return self.completed / elapsed if elapsed > 0 else 0.0
+    
+    def _report_progress(self, current_time):
+        fps = self.throughput(current_time)
+        remaining = self.total - self.completed - self.failed
+        eta = f"{remaining / fps:.0f}s" if fps > 0 else "unknown"
+        progress = (self.completed / self.total) * 100
+        logger.info(f"Progress: {self.completed}/{self.total} frames completed ({progress:.1f}%), "
+                    f"{self.failed} failed, {fps:.2f} frames/s, ETA {eta}")
+    
+    def log_summary(self):
+        elapsed = time.time() - self.start_time
+        logger.info(f"Rendered {self.completed} frames in {elapsed:.1f}s ({self.throughput():.2f} frames/s), "
+                    f"{self.failed} failed")
+        for pid, stats in sorted(self.workers.items()):
+            frames = max(1, stats['frames'])
+            logger.info(f"  worker {pid}: {stats['frames']} frames, {stats['failed']} failed, "
+                        f"render {stats['render_time'] / frames * 1000:.1f}ms/frame, "
+                        f"write {stats['write_time'] / frames * 1000:.1f}ms/frame")
 
 class CollatzCalculator:
     """Class to perform Collatz calculations with caching"""
@@ -102,6 +178,73 @@ class CollatzCalculator:
         self.cache[n] = result
         return result
 
+class PointSplatRasterizer:
+    """
+    Pure NumPy point renderer for headless machines (no GPU, display or pygame).
+    Reproduces the fixed-function GL path: gluPerspective projection, the same
+    modelview transform, round (GL_POINT_SMOOTH) points of point_size pixels and a
+    nearest-wins depth test, resolved with a depth sort instead of per-point Python work.
+    """
+    def __init__(self, width, height, fov=45.0, near=0.1, far=50.0, point_size=2):
+        self.width = width
+        self.height = height
+        self.near = near
+        self.far = far
+        self.point_size = int(point_size)
+        self.focal = 1.0 / math.tan(math.radians(fov) / 2.0)
+        self.aspect = width / height
+        
+        # Candidate pixel offsets around the pixel containing a point's center
+        reach = self.point_size // 2 + 1
+        offsets = np.arange(-reach, reach + 1)
+        self.offsets_x, self.offsets_y = [a.ravel() for a in np.meshgrid(offsets, offsets)]
+    
+    rotation_matrix = staticmethod(gl_rotation_matrix)
+    
+    def render(self, points, colors, rotation, translation, out):
+        """Render points (N, 3) with uint8 colors (N, 3) into the top-down image out"""
+        # Eye space: one matrix multiply for the whole point cloud
+        eye = points @ rotation.T.astype(np.float32) + np.asarray(translation, dtype=np.float32)
+        w = -eye[:, 2]
+        
+        # Perspective divide to normalized device coordinates
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ndc_x = (self.focal / self.aspect) * eye[:, 0] / w
+            ndc_y = self.focal * eye[:, 1] / w
+            ndc_z = ((self.far + self.near) * eye[:, 2] + 2 * self.far * self.near) / ((self.near - self.far) * w)
+        
+        inside = (w > 0) & (np.abs(ndc_z) <= 1)
+        
+        # Window coordinates of the point centers
+        wx = (ndc_x[inside] + 1) * 0.5 * self.width
+        wy = (ndc_y[inside] + 1) * 0.5 * self.height
+        depth = ndc_z[inside]
+        point_ids = np.flatnonzero(inside)
+        
+        # One sample per pixel whose center lies inside the point's disc
+        sx = (np.floor(wx).astype(np.int64)[:, None] + self.offsets_x)
+        sy = (np.floor(wy).astype(np.int64)[:, None] + self.offsets_y)
+        radius = self.point_size / 2.0
+        covered = (sx + 0.5 - wx[:, None]) ** 2 + (sy + 0.5 - wy[:, None]) ** 2 < radius * radius
+        sample_ids = np.broadcast_to(point_ids[:, None], covered.shape)[covered]
+        sample_depth = np.broadcast_to(depth[:, None], covered.shape)[covered]
+        sx, sy = sx[covered], sy[covered]
+        
+        on_screen = (sx >= 0) & (sx < self.width) & (sy >= 0) & (sy < self.height)
+        sx, sy = sx[on_screen], sy[on_screen]
+        sample_ids, sample_depth = sample_ids[on_screen], sample_depth[on_screen]
+        
+        # Depth test: sort near to far, the first sample of every pixel wins
+        pixel = (self.height - 1 - sy) * self.width + sx
+        order = np.argsort(sample_depth, kind='stable')
+        _, first = np.unique(pixel[order], return_index=True)
+        winners = order[first]
+        
+        image = out.reshape(-1, 3)
+        image[:] = 0
+        image[pixel[winners]] = colors[sample_ids[winners]]
+        return out
+
 class CollatzSphereRenderer:
     def __init__(self, config_path='collatz_sphere_config.json'):
         # Load configuration
@@ -119,6 +262,10 @@ class CollatzSphereRenderer:
                 "duration": 6,
                 "scale": 40.0,
                 "batch_size": 120,
+                "output_format": "png",
+                "render_backend": "gl",
+                "writer_threads": 2,
+                "cull_hidden": False,
                 "color": {
                     "max_power_norm": 64.0,
                     "max_value_norm": 32.0,
@@ -147,9 +294,19 @@ class CollatzSphereRenderer:
             'step_weight': 1.0
         })
         
-        # Batch size for frame rendering
+        # Frames each render worker handles before it is recycled
         self.batch_size = self.config.get('batch_size', 120)
         
+        # Frame output: png/bmp image sequence or raw rgb24 video chunks
+        self.output_format = self.config.get('output_format', 'png')
+        
+        # 'gl' renders through a hidden pygame/OpenGL window, 'numpy' is a headless software renderer
+        self.render_backend = self.config.get('render_backend', 'gl')
+        self.writer_threads = self.config.get('writer_threads', 2)
+        
+        # Skip the tiles of points facing away from the camera before submitting them
+        self.cull_hidden = self.config.get('cull_hidden', False)
+        
         # Calculate optimal thread count
         mem_info = psutil.virtual_memory()
         mem_per_thread = 100 * 1024 * 1024  # 100MB per thread as a conservative estimate
@@ -158,9 +315,8 @@ class CollatzSphereRenderer:
         self.thread_count = int(os.environ.get('RENDER_THREADS', min(mem_based_threads, cpu_based_threads)))
         logger.info(f"Using {self.thread_count} render threads (memory: {mem_info.available/1024/1024:.0f}MB available)")
         
-        # Shared resources and manager
+        # Shared resources
         self.shared_resources = []
-        self.manager = Manager()
         
         # Setup exit handler
         atexit.register(self.cleanup_resources)
@@ -168,12 +324,43 @@ class CollatzSphereRenderer:
         
         # Initialize a Collatz calculator
         self.calculator = CollatzCalculator(max_iterations=self.max_iterations)
+        self.attribute_cache = AttributeCache(self.config.get('cache_dir', '.collatz_cache'), 'offline_sphere_attributes')
         
         # Generate sphere points and share them
         self.generate_sphere_points()
         
     def generate_sphere_points(self):
         """Pre-generate sphere points and share them via shared memory"""
+        # Points only depend on resolution/scale/max_iterations; color or output
+        # edits reuse the cached attributes instead of recomputing Collatz numbers
+        point_settings = {'resolution': self.resolution, 'scale': self.scale, 'max_iterations': self.max_iterations}
+        cached = self.attribute_cache.load(point_settings)
+        if cached is not None:
+            logger.info(f"Loaded cached sphere points from {self.attribute_cache.path(point_settings)}")
+            self.points, self.collatz_values = cached['points'], cached['collatz_values']
+        else:
+            self.points, self.collatz_values = self._compute_sphere_points()
+            self.attribute_cache.save(point_settings, points=self.points, collatz_values=self.collatz_values)
+        
+        # Create shared memory for points
+        self.points_shm = shared_memory.SharedMemory(create=True, size=self.points.nbytes)
+        self.shared_resources.append(self.points_shm)
+        shared_points = np.ndarray(self.points.shape, dtype=self.points.dtype, buffer=self.points_shm.buf)
+        np.copyto(shared_points, self.points)
+        
+        # Create shared memory for Collatz values
+        self.values_shm = shared_memory.SharedMemory(create=True, size=self.collatz_values.nbytes)
+        self.shared_resources.append(self.values_shm)
+        shared_values = np.ndarray(self.collatz_values.shape, dtype=self.collatz_values.dtype, buffer=self.values_shm.buf)
+        np.copyto(shared_values, self.collatz_values)
+        
+        # Colors only depend on the Collatz values and color_params, compute them once here
+        self.colors_shm = None
+        self._colors_key = None
+        self.update_colors()
+    
+    def _compute_sphere_points(self):
+        """Evaluate the Collatz mapping over the sphere grid, returns (points, collatz_values)"""
         logger.info("Generating sphere points...")
         
         # Calculate total number of points
@@ -216,20 +403,26 @@ class CollatzSphereRenderer:
         logger.info(f"Generated {len(points)} valid points")
         
         # Convert to numpy arrays
-        self.points = np.array(points, dtype=np.float32)
-        self.collatz_values = np.array(collatz_values, dtype=np.float32)
+        return np.array(points, dtype=np.float32), np.array(collatz_values, dtype=np.float32)
+    
+    def update_colors(self, color_params=None):
+        """Compute point colors into shared memory; only recomputed when color_params change"""
+        if color_params is not None:
+            self.color_params = color_params
         
-        # Create shared memory for points
-        self.points_shm = shared_memory.SharedMemory(create=True, size=self.points.nbytes)
-        self.shared_resources.append(self.points_shm)
-        shared_points = np.ndarray(self.points.shape, dtype=self.points.dtype, buffer=self.points_shm.buf)
-        np.copyto(shared_points, self.points)
+        colors_key = json.dumps(self.color_params, sort_keys=True)
+        if self.colors_shm is not None and colors_key == self._colors_key:
+            return
         
-        # Create shared memory for Collatz values
-        self.values_shm = shared_memory.SharedMemory(create=True, size=self.collatz_values.nbytes)
-        self.shared_resources.append(self.values_shm)
-        shared_values = np.ndarray(self.collatz_values.shape, dtype=self.collatz_values.dtype, buffer=self.values_shm.buf)
-        np.copyto(shared_values, self.collatz_values)
+        colors = self.compute_point_colors(self.points, self.collatz_values, self.color_params)
+        if self.colors_shm is None:
+            self.colors_shm = shared_memory.SharedMemory(create=True, size=max(1, colors.nbytes))
+            self.shared_resources.append(self.colors_shm)
+        shared_colors = np.ndarray(colors.shape, dtype=colors.dtype, buffer=self.colors_shm.buf)
+        np.copyto(shared_colors, colors)
+        self.colors = colors
+        self._colors_key = colors_key
+        logger.info(f"Computed colors for {len(colors)} points")
                 
     def _map_to_number(self, x, y, z):
         """Map 3D coordinates to a Collatz sequence number"""
@@ -239,23 +432,10 @@ class CollatzSphereRenderer:
         base_number = int(r * math.pow(2, self.scale))
         
         # Apply pattern-based adjustments
-        patterns = {
-            '101': 1.1,    # L-type harbor pattern
-            '111': 0.9,    # Mersenne-like pattern
-            '1010': 1.05,  # Alternating pattern
-        }
-        
-        for pattern, factor in patterns.items():
-            if self._has_bit_pattern(base_number, pattern):
-                base_number = int(base_number * factor)
+        base_number = PATTERN_ADJUSTMENTS.apply(base_number)
         
         return max(1, base_number)
         
-    def _has_bit_pattern(self, n, pattern):
-        """Check if number contains specific binary pattern."""
-        bin_str = bin(n)[2:]  # Convert to binary, remove '0b' prefix
-        return pattern in bin_str
-        
     def cleanup_resources(self):
         """Clean up any shared memory resources"""
         for shm in self.shared_resources:
@@ -276,202 +456,369 @@ class CollatzSphereRenderer:
         sys.exit(0)
         
     @staticmethod
-    def render_frame_static(frame_args):
-        """Static method for multiprocessing to render a single frame"""
+    def compute_point_colors(points, collatz_values, color_params):
+        """Vectorized per-point colors (same mapping the renderer always used)"""
+        max_iterations = color_params.get('max_iterations', 320)
+        max_value_norm = color_params.get('max_value_norm', 32.0)
+        
+        steps = collatz_values[:, 0].astype(np.float64)
+        max_value = collatz_values[:, 1].astype(np.float64)
+        z_coord = points[:, 2].astype(np.float64)
+        
+        steps_norm = np.minimum(1.0, steps / max_iterations)
+        value_norm = np.zeros_like(max_value)
+        positive = max_value > 0
+        value_norm[positive] = np.minimum(1.0, np.log2(max_value[positive]) / max_value_norm)
+        z_norm = (z_coord + 1) / 2
+        
+        # Frame-specific color adjustment (pulse effect)
+        # frame_factor = 0.1 * math.sin(frame / 10.0) + 0.9
+        frame_factor = 1.0
+        
+        colors = np.empty((len(points), 3), dtype=np.float32)
+        colors[:, 0] = steps_norm * frame_factor
+        colors[:, 1] = value_norm * 0.5 + z_norm * 0.5
+        colors[:, 2] = (1.0 - steps_norm) * z_norm * frame_factor
+        return colors
+    
+    @staticmethod
+    def _create_point_buffers(points, colors):
+        """Upload positions and colors into vertex buffers, returns the buffer ids"""
+        point_buffers = glGenBuffers(2)
+        glBindBuffer(GL_ARRAY_BUFFER, point_buffers[0])
+        glBufferData(GL_ARRAY_BUFFER, points.nbytes, points, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, point_buffers[1])
+        glBufferData(GL_ARRAY_BUFFER, colors.nbytes, colors, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        return point_buffers
+    
+    @staticmethod
+    def _draw_point_buffers(point_buffers, point_count, ranges=None):
+        """Draw all points from the vertex buffers with one glDrawArrays call,
+        or only the (firsts, counts) ranges with one glMultiDrawArrays call"""
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        
+        glBindBuffer(GL_ARRAY_BUFFER, point_buffers[0])
+        glVertexPointer(3, GL_FLOAT, 0, None)
+        glBindBuffer(GL_ARRAY_BUFFER, point_buffers[1])
+        glColorPointer(3, GL_FLOAT, 0, None)
+        
+        if ranges is None:
+            glDrawArrays(GL_POINTS, 0, point_count)
+        elif len(ranges[0]):
+            glMultiDrawArrays(GL_POINTS, ranges[0], ranges[1], len(ranges[0]))
+        
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        
+    @staticmethod
+    def init_render_worker(worker_args, progress_queue):
+        """Pool initializer: set up the renderer, shared memory and point buffers once per worker"""
+        (points_shm_name, colors_shm_name, point_count, output_dir,
+         width, height, framerate, duration, output_format, writer_threads,
+         render_backend, cull_hidden, manifest) = worker_args
+        
+        # Ctrl+C is handled by the parent, which owns the shared memory
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        
+        # Access shared memory for points
+        points_shm = shared_memory.SharedMemory(name=points_shm_name)
+        points = np.ndarray((point_count, 3), dtype=np.float32, buffer=points_shm.buf)
+        
+        # Access shared memory for the precomputed point colors
+        colors_shm = shared_memory.SharedMemory(name=colors_shm_name)
+        colors = np.ndarray((point_count, 3), dtype=np.float32, buffer=colors_shm.buf)
+        
+        # With culling the worker keeps its points in direction-tile order, so the visible
+        # part of every frame is a few contiguous ranges
+        tiles = SphereTiles(points) if cull_hidden else None
+        if tiles is not None:
+            points, colors = points[tiles.order], colors[tiles.order]
+        
+        if render_backend == 'numpy':
+            _worker_state.update({
+                'rasterizer': PointSplatRasterizer(width, height),
+                'points': points,
+                'colors': np.round(np.clip(colors, 0.0, 1.0) * 255).astype(np.uint8)
+            })
+        else:
+            _worker_state['point_buffers'] = CollatzSphereRenderer._init_gl_context(width, height, points, colors)
+        
+        # Encoding and disk writes run on writer threads while the next frame renders
+        writer = AsyncFrameWriter(
+            output_dir, width, height, fmt=output_format, threads=writer_threads,
+            chunk_frames=framerate,
+            on_written=CollatzSphereRenderer._on_frame_written,
+            on_failed=CollatzSphereRenderer._on_frame_write_failed
+        )
+        
+        _worker_state.update({
+            'backend': render_backend,
+            'tiles': tiles,
+            'points_shm': points_shm,
+            'colors_shm': colors_shm,
+            'point_count': point_count,
+            'writer': writer,
+            'width': width,
+            'height': height,
+            'total_frames': framerate * duration,
+            'manifest': manifest,
+            'progress_queue': progress_queue,
+            'render_times': {}
+        })
+        
+        # Runs before the progress queue's own finalizers, so the writer's last events are still sent
+        util.Finalize(None, CollatzSphereRenderer.shutdown_render_worker, exitpriority=100)
+        logger.debug(f"Render worker {os.getpid()} ({render_backend}) ready with {point_count} points")
+    
+    @staticmethod
+    def _init_gl_context(width, height, points, colors):
+        """Open a hidden pygame/OpenGL window and upload the points, returns the buffer ids"""
+        if pygame is None:
+            raise RuntimeError("The 'gl' render backend needs pygame and PyOpenGL, use --backend numpy")
+        
+        # Initialize pygame for this process
+        os.environ['SDL_VIDEO_WINDOW_POS'] = '0,0'
+        pygame.init()
+        pygame.display.set_mode(
+            (width, height), 
+            pygame.OPENGL | pygame.DOUBLEBUF | pygame.HIDDEN
+        )
+        
+        # Setup OpenGL
+        glEnable(GL_DEPTH_TEST)
+        glEnable(GL_POINT_SMOOTH)
+        glPointSize(2.0)
+        
+        glMatrixMode(GL_PROJECTION)
+        glLoadIdentity()
+        gluPerspective(45, (width / height), 0.1, 50.0)
+        glMatrixMode(GL_MODELVIEW)
+        glPixelStorei(GL_PACK_ALIGNMENT, 1)
+        
+        # Upload positions and colors once, every frame reuses the same buffers
+        return CollatzSphereRenderer._create_point_buffers(points, colors)
+    
+    @staticmethod
+    def shutdown_render_worker():
+        """Release the renderer and shared memory of a render worker when it exits"""
         try:
-            # Unpack frame arguments
-            (frame, points_shm_name, values_shm_name, point_count, values_count, output_dir,
-             width, height, color_params, framerate, duration, tracker) = frame_args
-             
-            # Access shared memory for points
-            points_shm = shared_memory.SharedMemory(name=points_shm_name)
-            points = np.ndarray((point_count, 3), dtype=np.float32, buffer=points_shm.buf)
-            
-            # Access shared memory for Collatz values
-            values_shm = shared_memory.SharedMemory(name=values_shm_name)
-            collatz_values = np.ndarray((values_count, 3), dtype=np.float32, buffer=values_shm.buf)
+            _worker_state['writer'].close()
+            if _worker_state['backend'] == 'gl':
+                glDeleteBuffers(2, _worker_state['point_buffers'])
+                pygame.quit()
+        except Exception as e:
+            logger.error(f"Error shutting down render worker: {str(e)}")
+        finally:
+            # Drop the array views before closing the shared memory they point into
+            _worker_state.pop('points', None)
+            _worker_state['points_shm'].close()
+            _worker_state['colors_shm'].close()
+            _worker_state.clear()
+    
+    @staticmethod
+    def frame_rotation_angle(frame, total_frames):
+        """Camera rotation (degrees) of a frame"""
+        return (frame / total_frames) * 360.0 * 2
+    
+    @staticmethod
+    def frame_rotation(rotation_angle):
+        """Rotation matrix of the camera transform in _draw_gl_frame (the flat offset has no axis)"""
+        return PointSplatRasterizer.rotation_matrix(rotation_angle, (0.0, 0.5, 0.25))
+    
+    @staticmethod
+    def _on_frame_written(frame, path, elapsed):
+        """Writer thread callback: journal the finished frame so a restart can skip it"""
+        state = _worker_state
+        rotation_angle = CollatzSphereRenderer.frame_rotation_angle(frame, state['total_frames'])
+        state['manifest'].record(frame, path, rotation_angle=rotation_angle)
+        render_time = state['render_times'].pop(frame, 0.0)
+        RenderProgress.frame_done(state['progress_queue'], frame, render_time, elapsed)
+    
+    @staticmethod
+    def _on_frame_write_failed(frame, error):
+        """Writer thread callback for frames that could not be encoded or saved"""
+        logger.error(f"Error writing frame {frame}: {str(error)}")
+        _worker_state['render_times'].pop(frame, None)
+        RenderProgress.frame_failed(_worker_state['progress_queue'], frame)
+    
+    @staticmethod
+    def _draw_gl_frame(point_buffers, point_count, rotation_angle, ranges=None):
+        """Draw one frame into the worker's GL context"""
+        # Clear buffers
+        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+        glLoadIdentity()
+        
+        # Position camera
+        glTranslatef(0, 0, -2)
+
+        # Flat rotation offset
+        glRotatef(2, 0.0, 0.0, 0.0)
+        
+        # Apply rotation
+        glRotatef(rotation_angle, 0.0, 0.5, 0.25)  # Rotation around an angled axis
+        
+        # Render points from vertex buffers with a single draw call
+        CollatzSphereRenderer._draw_point_buffers(point_buffers, point_count, ranges)
+    
+    @staticmethod
+    def render_frame_static(frame):
+        """Render a single frame with the renderer set up by init_render_worker"""
+        state = _worker_state
+        writer = state['writer']
+        buffer = None
+        try:
+            width, height = state['width'], state['height']
             
             # Calculate camera rotation based on frame
-            total_frames = framerate * duration
-            rotation_angle = (frame / total_frames) * 360.0 * 2
-            
-            # Initialize pygame for this process
-            os.environ['SDL_VIDEO_WINDOW_POS'] = '0,0'
-            pygame.init()
-            display = pygame.display.set_mode(
-                (width, height), 
-                pygame.OPENGL | pygame.DOUBLEBUF | pygame.HIDDEN
-            )
+            rotation_angle = CollatzSphereRenderer.frame_rotation_angle(frame, state['total_frames'])
             
-            # Setup OpenGL
-            glEnable(GL_DEPTH_TEST)
-            glEnable(GL_POINT_SMOOTH)
-            glPointSize(2.0)
+            buffer = writer.acquire_buffer()
+            start = time.perf_counter()  # Waiting for a free buffer is writer time, not render time
             
-            glMatrixMode(GL_PROJECTION)
-            glLoadIdentity()
-            gluPerspective(45, (width / height), 0.1, 50.0)
-            glMatrixMode(GL_MODELVIEW)
+            # Same camera for both backends: translate to z=-2, then rotate around the angled axis
+            rotation = CollatzSphereRenderer.frame_rotation(rotation_angle)
+            tiles = state['tiles']
+            eye = object_space_eye(rotation, (0, 0, -2)) if tiles is not None else None
             
-            # Clear buffers
-            glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-            glLoadIdentity()
-            
-            # Position camera
-            glTranslatef(0, 0, -2)
-
-            # Flat rotation offset
-            glRotatef(2, 0.0, 0.0, 0.0)
-            
-            # Apply rotation
-            glRotatef(rotation_angle, 0.0, 0.5, 0.25)  # Rotation around an angled axis
-            
-            # Render points with their colors
-            glBegin(GL_POINTS)
-            for i in range(len(points)):
-                # Get point coordinates
-                point = points[i]
-                
-                # Get Collatz values for coloring
-                steps = collatz_values[i][0]
-                max_value = collatz_values[i][1]
-                z_coord = point[2]
-                
-                # Calculate color (same as in original code)
-                max_iterations = color_params.get('max_iterations', 320)
-                max_value_norm = color_params.get('max_value_norm', 32.0)
-                
-                steps_norm = min(1.0, steps / max_iterations)
-                value_norm = min(1.0, math.log2(max_value) / max_value_norm) if max_value > 0 else 0
-                z_norm = (z_coord + 1) / 2
-                
-                # Frame-specific color adjustment (pulse effect)
-                # frame_factor = 0.1 * math.sin(frame / 10.0) + 0.9
-                frame_factor = 1.0
-                
-                color = (
-                    steps_norm * frame_factor,
-                    value_norm * 0.5 + z_norm * 0.5,
-                    (1.0 - steps_norm) * z_norm * frame_factor
-                )
+            if state['backend'] == 'numpy':
+                points, colors = state['points'], state['colors']
+                if tiles is not None:
+                    visible = tiles.visible_mask(eye)
+                    points, colors = points[visible], colors[visible]
+                state['rasterizer'].render(points, colors, rotation, (0, 0, -2), buffer)
+                state['render_times'][frame] = time.perf_counter() - start
+                writer.submit(frame, buffer, bottom_up=False)
+            else:
+                ranges = tiles.visible_ranges(eye) if tiles is not None else None
+                CollatzSphereRenderer._draw_gl_frame(state['point_buffers'], state['point_count'],
+                                                     rotation_angle, ranges)
                 
-                glColor3fv(color)
-                glVertex3fv(point)
-            glEnd()
-            
-            # Capture frame
-            frame_data = glReadPixels(0, 0, width, height, GL_RGB, GL_UNSIGNED_BYTE)
-            surface = pygame.image.fromstring(frame_data, (width, height), 'RGB')
-            
-            # Flip the image vertically (OpenGL coordinates are bottom-left)
-            surface = pygame.transform.flip(surface, False, True)
-            
-            # Create output directory if it doesn't exist
-            os.makedirs(output_dir, exist_ok=True)
-            
-            # Save frame
-            output_path = os.path.join(output_dir, f'frame_{frame:08d}.bmp')
-            pygame.image.save(surface, output_path)
-            
-            # Mark frame as complete
-            tracker.mark_complete()
-            
-            # Clean up resources
-            points_shm.close()
-            values_shm.close()
-            pygame.quit()
-            
-            # Free memory
-            del surface
-            del frame_data
-            gc.collect()
+                # Read the frame straight into a writer buffer and queue it; the writer
+                # flips it (OpenGL rows are bottom-up), encodes it and marks it complete
+                glReadPixels(0, 0, width, height, GL_RGB, GL_UNSIGNED_BYTE, buffer)
+                state['render_times'][frame] = time.perf_counter() - start
+                writer.submit(frame, buffer)
+            return True
             
         except Exception as e:
-            if tracker:
-                tracker.mark_failed()
+            if buffer is not None:
+                writer.release_buffer(buffer)
+            RenderProgress.frame_failed(state['progress_queue'], frame)
             logger.error(f"Error rendering frame {frame}: {str(e)}")
             logger.error(traceback.format_exc())
-            
-            # Make sure to close shared memory even on error
-            try:
-                points_shm.close()
-                values_shm.close()
-            except:
-                pass
+            return False
+    
+    def _render_frames(self, frames, worker_args):
+        """Render frames on a pool of long-lived workers that pull frame numbers as they go.
+        Returns the RenderProgress with the final counts."""
+        progress = RenderProgress(len(frames))
+        progress.start()
+        
+        processes = max(1, min(self.thread_count, len(frames)))
+        try:
+            with multiprocessing.Pool(processes=processes,
+                                      initializer=self.init_render_worker,
+                                      initargs=(worker_args, progress.queue),
+                                      maxtasksperchild=self.batch_size) as pool:
+                for _ in pool.imap_unordered(self.render_frame_static, frames):
+                    pass
+                pool.close()
+                pool.join()
+        finally:
+            progress.stop()
+        
+        progress.log_summary()
+        return progress
                 
-    def generate_animation_frames(self, output_dir='./collatz_frames'):
-        """Generate animation frames in batches with progress tracking"""
+    def point_data_hash(self):
+        """Hash of the shared point data, frames rendered from other data are invalid"""
+        digest = hashlib.sha256()
+        digest.update(self.points.tobytes())
+        digest.update(self.collatz_values.tobytes())
+        return digest.hexdigest()
+    
+    def render_params_hash(self):
+        """Hash of every parameter that changes the rendered frames"""
+        params = {
+            'width': self.width,
+            'height': self.height,
+            'framerate': self.framerate,
+            'duration': self.duration,
+            'output_format': self.output_format,
+            'render_backend': self.render_backend,
+            'color': self.color_params
+        }
+        if self.cull_hidden:
+            # Only part of the hash when on, so manifests of earlier renders stay valid
+            params['cull_hidden'] = True
+        return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+    
+    def generate_animation_frames(self, output_dir='./collatz_frames', fresh=False):
+        """Render the frames that are missing from output_dir on persistent render workers.
+        Finished frames are journaled in a manifest, so an interrupted render resumes
+        where it stopped unless fresh is set."""
         try:
-            logger.info(f"Preparing to render {self.total_frames} frames using {self.thread_count} processes")
-
-            # Clear output directory
             os.makedirs(output_dir, exist_ok=True)
-            for f in os.listdir(output_dir):
-                os.remove(os.path.join(output_dir, f))
+            manifest = FrameManifest(output_dir, self.point_data_hash(), self.render_params_hash())
             
-            # Setup progress tracking
-            tracker = FrameTracker(self.total_frames, self.manager)
+            completed = {} if fresh else manifest.completed_frames()
+            if not completed:
+                # Nothing reusable, start from a clean output directory
+                manifest.clear()
+                for f in os.listdir(output_dir):
+                    os.remove(os.path.join(output_dir, f))
+            else:
+                # Leftovers of writes interrupted by a crash
+                for f in os.listdir(output_dir):
+                    if f.endswith('.tmp'):
+                        os.remove(os.path.join(output_dir, f))
             
-            # Process frames in batches to manage memory better
-            for batch_start in range(0, self.total_frames, self.batch_size):
-                batch_end = min(batch_start + self.batch_size, self.total_frames)
-                batch_size = batch_end - batch_start
-                
-                logger.info(f"Processing batch {batch_start//self.batch_size + 1} " 
-                          f"(frames {batch_start}-{batch_end-1}, {batch_size} frames)")
-                
-                # Prepare frame rendering arguments for this batch
-                frame_args = [
-                    (frame, self.points_shm.name, self.values_shm.name, 
-                     len(self.points), len(self.collatz_values),
-                     output_dir, self.width, self.height, 
-                     self.color_params, self.framerate, self.duration,
-                     tracker) 
-                    for frame in range(batch_start, batch_end)
-                ]
-                
-                # Process this batch
-                with multiprocessing.Pool(processes=self.thread_count) as pool:
-                    pool.map(self.render_frame_static, frame_args)
-                
-                # Explicitly call garbage collection between batches
-                gc.collect()
-                
-                # Check if we should take a short break between batches
-                if batch_end < self.total_frames:
-                    logger.info("Short pause between batches to manage memory...")
-                    time.sleep(1)  # Short pause between batches
+            pending = [frame for frame in range(self.total_frames) if frame not in completed]
+            if completed:
+                logger.info(f"Resuming render: {len(completed)} frames already done, {len(pending)} to render")
+            if not pending:
+                logger.info(f"All {self.total_frames} frames are already rendered in {os.path.abspath(output_dir)}")
+                return
+            
+            logger.info(f"Preparing to render {len(pending)} frames using {self.thread_count} processes "
+                        f"(workers recycled every {self.batch_size} frames)")
+            
+            # Refresh the shared colors in case color_params changed since the last render
+            self.update_colors()
             
-            # Verify all frames were created
-            missing_frames = []
-            for frame in range(self.total_frames):
-                frame_path = os.path.join(output_dir, f'frame_{frame:08d}.bmp')
-                if not os.path.exists(frame_path):
-                    missing_frames.append(frame)
+            worker_args = (self.points_shm.name, self.colors_shm.name, len(self.points),
+                           output_dir, self.width, self.height, 
+                           self.framerate, self.duration,
+                           self.output_format, self.writer_threads, self.render_backend,
+                           self.cull_hidden, manifest)
             
+            progress = self._render_frames(pending, worker_args)
+            completed_count, failed_count = progress.completed, progress.failed
+            
+            # Verify all frames were created and give failed ones one more try
+            completed = manifest.completed_frames()
+            missing_frames = [frame for frame in range(self.total_frames) if frame not in completed]
             if missing_frames:
                 logger.warning(f"Missing {len(missing_frames)} frames. First few: {missing_frames[:5]}")
+                logger.info(f"Re-rendering {len(missing_frames)} missing frames...")
+                progress = self._render_frames(missing_frames, worker_args)
+                completed_count += progress.completed
+                failed_count = progress.failed
                 
-                # Re-render missing frames if there aren't too many
-                if len(missing_frames) < self.total_frames * 0.1:  # Less than 10% missing
-                    logger.info(f"Re-rendering {len(missing_frames)} missing frames...")
-                    
-                    # Prepare frame rendering arguments for missing frames
-                    frame_args = [
-                        (frame, self.points_shm.name, self.values_shm.name, 
-                         len(self.points), len(self.collatz_values),
-                         output_dir, self.width, self.height, 
-                         self.color_params, self.framerate, self.duration,
-                         tracker) 
-                        for frame in missing_frames
-                    ]
-                    
-                    # Process missing frames
-                    with multiprocessing.Pool(processes=min(self.thread_count, len(missing_frames))) as pool:
-                        pool.map(self.render_frame_static, frame_args)
+                completed = manifest.completed_frames()
+                missing_frames = [frame for frame in range(self.total_frames) if frame not in completed]
+                if missing_frames:
+                    logger.warning(f"Still missing {len(missing_frames)} frames, rerun to render them")
             
             logger.info(f"Rendering complete. Frames saved to {os.path.abspath(output_dir)}")
-            logger.info(f"Final stats: {tracker.completed.value} completed, {tracker.failed.value} failed")
+            if self.output_format == 'raw':
+                logger.info(f"Raw frames are rgb24 {self.width}x{self.height}, {self.framerate} per chunk, e.g. "
+                            f"ffmpeg -f rawvideo -pix_fmt rgb24 -s {self.width}x{self.height} "
+                            f"-r {self.framerate} -i \"concat:frames_00000.rgb|frames_00001.rgb|...\" out.mp4")
+            logger.info(f"Final stats: {completed_count} completed, {failed_count} failed")
             
         except Exception as e:
             logger.error(f"Error in animation generation: {str(e)}")
@@ -491,6 +838,10 @@ def create_default_config():
         "duration": 6,
         "scale": 40.0,
         "batch_size": 120,
+        "output_format": "png",
+        "render_backend": "gl",
+        "writer_threads": 2,
+        "cull_hidden": False,
         "color": {
             "max_power_norm": 64.0,
             "max_value_norm": 32.0,
@@ -512,8 +863,15 @@ def main():
     parser = argparse.ArgumentParser(description='Generate Collatz 3D sphere animation')
     parser.add_argument('--config', '-c', default='collatz_sphere_config.json', help='Path to config file')
     parser.add_argument('--output', '-o', default='./collatz_frames', help='Output directory for frames')
-    parser.add_argument('--batch-size', '-b', type=int, help='Override batch size for frame processing')
+    parser.add_argument('--batch-size', '-b', type=int, help='Override how many frames each render worker handles before it is recycled')
     parser.add_argument('--threads', '-t', type=int, help='Override number of processing threads')
+    parser.add_argument('--format', '-f', choices=FRAME_FORMATS, help='Override frame output format')
+    parser.add_argument('--backend', choices=('gl', 'numpy'),
+                        help="Override render backend ('numpy' needs no GPU or display)")
+    parser.add_argument('--cull', action='store_true',
+                        help='Skip points facing away from the camera. Faster, but changes the image: '
+                             'back-side points that show through the sparse cloud disappear')
+    parser.add_argument('--fresh', action='store_true', help='Discard previously rendered frames instead of resuming')
     parser.add_argument('--verbose', '-v', action='store_true', help='Enable verbose logging')
     args = parser.parse_args()
     
@@ -532,6 +890,20 @@ def main():
         renderer.batch_size = args.batch_size
         logger.info(f"Overriding batch size to {args.batch_size}")
     
+    # Override output format if specified
+    if args.format:
+        renderer.output_format = args.format
+        logger.info(f"Overriding output format to {args.format}")
+    
+    # Override render backend if specified
+    if args.backend:
+        renderer.render_backend = args.backend
+        logger.info(f"Overriding render backend to {args.backend}")
+    
+    if args.cull:
+        renderer.cull_hidden = True
+        logger.info("Culling hidden points (back-side points visible through the cloud are dropped)")
+    
     # Override thread count if specified
     if args.threads:
         renderer.thread_count = args.threads
@@ -539,7 +911,7 @@ def main():
     
     try:
         # Generate frames
-        renderer.generate_animation_frames(output_dir=args.output)
+        renderer.generate_animation_frames(output_dir=args.output, fresh=args.fresh)
     
     except KeyboardInterrupt:
         logger.info("\nInterrupted by user. Cleaning up resources...")
@@ -1,11 +1,7 @@
 import matplotlib.pyplot as plt
+from collatz_bitpatterns import contains_pattern
 import numpy as np
 
-def contains_pattern(n, pattern):
-    """Checks if the binary representation of n contains the given pattern."""
-    binary_string = bin(n)[2:]
-    return pattern in binary_string
-
 def is_in_S1(n):
     """Checks if a number belongs to the secondary harbor set S1."""
     while n % 2 == 0:
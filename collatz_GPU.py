@@ -5,29 +5,153 @@ Based on the clean patterns from the 4D toroid viewer
 Explores Collatz sequence patterns mapped onto a sphere in real-time
 """
 
+import argparse
+import contextlib
+import json
 import math
+import os
 import sys
 import time
 import ctypes
+import multiprocessing
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import numpy as np
+
+# pygame greets on stdout at import, which would corrupt --benchmark-output -
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
 import pygame
 from pygame.locals import DOUBLEBUF, OPENGL
 from OpenGL.GL import *
 from OpenGL.GL import shaders
+from collatz_exact_attributes import compute_sphere_attributes, sphere_points
+from collatz_culling import SphereTiles, object_space_eye
+from collatz_frames import AsyncFrameWriter, FRAME_FORMATS
+
+# Identifies the contents of an attribute buffer: one batch of points under one set of parameters
+BatchKey = namedtuple('BatchKey', 'backend point_count scale_exponent max_iterations batch_offset vertex_count')
+
+# One record of the progressive buffer: the attributes of a converged point and its lattice index
+COMPACT_RECORD = np.dtype([('attributes', np.float32, 4), ('point_id', np.uint32)])
+
+# Identifies the lattice points of a cull index: the attributes do not matter for culling
+CullKey = namedtuple('CullKey', 'point_count batch_offset count')
+
+
+class StageTimer:
+    """
+    Rolling per-stage frame timings from monotonic-clock spans, cheap enough to leave on.
+
+    mark(stage) closes the span that began at the previous mark (or begin()), so a frame
+    of n stages costs n perf_counter calls and list writes. The last window spans of each
+    stage are kept in a ring; percentiles and histograms are only computed for reports.
+    """
+    # Upper edges of the histogram bins, in ms; the last bin is open-ended
+    HISTOGRAM_EDGES_MS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0)
+    
+    def __init__(self, window=300):
+        self.window = window
+        self.last = {}  # Stage -> last span in seconds
+        self._rings = {}  # Stage -> [samples, next position, samples recorded]
+        self._start = time.perf_counter()
+    
+    def begin(self):
+        """Start the first span of a frame"""
+        self._start = time.perf_counter()
+    
+    def mark(self, stage):
+        """Record the time since the previous mark under stage"""
+        now = time.perf_counter()
+        elapsed = now - self._start
+        self._start = now
+        
+        ring = self._rings.get(stage)
+        if ring is None:
+            ring = self._rings[stage] = [[0.0] * self.window, 0, 0]
+        ring[0][ring[1]] = elapsed
+        ring[1] = (ring[1] + 1) % self.window
+        ring[2] += 1
+        self.last[stage] = elapsed
+    
+    def samples(self, stage):
+        """Recorded spans of a stage in ms, oldest first"""
+        values, position, recorded = self._rings[stage]
+        if recorded < self.window:
+            values = values[:recorded]
+        else:
+            values = values[position:] + values[:position]
+        return np.array(values) * 1000.0
+    
+    def summary(self):
+        """mean/p50/p95/max in ms and histogram counts (see HISTOGRAM_EDGES_MS) per stage"""
+        result = {}
+        for stage in self._rings:
+            values = self.samples(stage)
+            result[stage] = {
+                'mean': float(values.mean()),
+                'p50': float(np.percentile(values, 50)),
+                'p95': float(np.percentile(values, 95)),
+                'max': float(values.max()),
+                'histogram': np.bincount(np.searchsorted(self.HISTOGRAM_EDGES_MS, values),
+                                         minlength=len(self.HISTOGRAM_EDGES_MS) + 1).tolist()
+            }
+        return result
+    
+    def report(self):
+        """Text table of the summary, with the histogram drawn as a bar of density characters"""
+        shades = ' .:-=+*#'
+        edges = ', '.join(f'{edge:g}' for edge in self.HISTOGRAM_EDGES_MS)
+        lines = [f"{'stage':<10} {'mean':>7} {'p50':>7} {'p95':>7} {'max':>7}  histogram (ms bins: {edges}, more)"]
+        for stage, stats in self.summary().items():
+            peak = max(stats['histogram'])
+            bar = ''.join(shades[(count * (len(shades) - 1)) // peak] for count in stats['histogram'])
+            lines.append(f"{stage:<10} {stats['mean']:7.3f} {stats['p50']:7.3f} {stats['p95']:7.3f} "
+                         f"{stats['max']:7.3f}  |{bar}|")
+        return '\n'.join(lines)
+
+
+def build_cull_index(point_count, start, stop, tiles_per_face, max_stride):
+    """
+    Direction tiles of lattice points start..stop-1, plus the number of points of every
+    tile drawn at each power-of-two stride. Within a tile the points are ordered by the
+    bit-reversed low bits of their batch index, so the points drawn at stride s (index
+    divisible by s) come first and each tile stays one range at every stride.
+    """
+    local = np.arange(stop - start, dtype=np.int64)
+    bits = max_stride.bit_length() - 1
+    reversed_low = np.zeros_like(local)
+    for bit in range(bits):
+        reversed_low |= ((local >> bit) & 1) << (bits - 1 - bit)
+    
+    tiles = SphereTiles(sphere_points(point_count, start, stop).T, tiles_per_face, secondary_key=reversed_low)
+    level_counts = {
+        1 << level: np.bincount(tiles.tile_of[tiles.order % (1 << level) == 0], minlength=tiles.tile_count)
+        for level in range(bits + 1)
+    }
+    return tiles, level_counts
 
 class CollatzSphereViewer:
-    def __init__(self):
+    def __init__(self, compute_backend='gpu', adaptive=False, target_fps=60.0, cull_hidden=False):
         # Sphere parameters
         self.radius = 1.0
         self.point_count = 50_000
-        self.max_point_count = 5_000_000  # Allow scaling up to 5M points
+        self.max_point_count = 64_000_000  # Indices are exact; latitudes are float32 (see generate_sphere_point)
         self.scale_exponent = 40.0  # For mapping position to number
         self.max_iterations = 420
         
+        # Attribute backend: 'gpu' runs the 32-bit shader pass, 'cpu' evaluates the exact
+        # mapping in a background process, which allows far larger scale exponents
+        self.compute_backend = compute_backend
+        self.max_scale_exponent = {'gpu': 40.0, 'cpu': 256.0}
+        
         # Streaming parameters
         self.use_streaming = False  # Start with streaming disabled
         self.stream_batch_size = 100_000  # Points to process per batch
-        self.ram_buffer_size = 500_000  # Max points to keep in RAM buffer
+        self.ram_buffer_size = 500_000  # Max points drawn per streaming batch
+        self.stream_buffer_count = 2  # Attribute buffers rotated while streaming
+        self.auto_cycle = False  # Advance through the batches automatically
+        self.auto_cycle_interval = 0.25  # Minimum seconds each batch stays on screen
         
         # Display settings
         self.width = 1920
@@ -41,26 +165,88 @@ class CollatzSphereViewer:
         self.auto_rotate = False
         self.rotate_speed = [0.3, 0.5]
         
-        # GL objects
+        # GL objects; points are generated from gl_VertexID, so there is no index buffer
         self.shader_program = None
-        self.vao = None
-        self.vbo = None
         self.vertex_count = 0
         self.uniforms = {}
         
-        # Streaming buffer management
-        self.ram_buffer = None  # Numpy array for system RAM buffer
-        self.buffer_valid_count = 0  # How many points in buffer are valid
+        # Collatz attributes (steps, max value, convergence speed, converged) per buffered point.
+        # Each slot holds one batch and is only recomputed when the batch or parameters change
+        self.attribute_program = None
+        self.attribute_vao = None
+        self.attribute_uniforms = {}
+        self.attribute_slots = []
+        self.display_slot = None  # Index of the slot being drawn
+        self.attribute_executor = None
+        
+        # Progressive mode: every batch is computed once and its converged points are appended,
+        # as (attributes, point id) records, to one compacted buffer of at most progressive_budget_mb
+        self.progressive = False
+        self.progressive_budget_mb = 256
+        self.compact_program = None
+        self.compact_uniforms = {}
+        self.progressive_vbo = None
+        self.progressive_vao = None
+        self.progressive_query = None
+        self.progressive_capacity = 0  # Records the buffer can hold
+        self.progressive_count = 0  # Records stored
+        self.progressive_key = None  # BatchKey of the accumulation, with batch_offset 0
+        self.progressive_next_offset = 0  # First point of the next batch to compute
+        self.progressive_pending = None  # (start, future) of the CPU batch in flight
+        self.progressive_full = False
+        
+        # Adaptive point budget: draw every draw_stride-th point, with the stride chosen
+        # from measured frame times so the viewer stays near target_fps
+        self.adaptive = adaptive
+        self.target_fps = target_fps
+        self.draw_stride = 1
+        self.max_draw_stride = 64
+        self._frame_ms_avg = None
+        self._over_budget_frames = 0
+        self._under_budget_frames = 0
+        
+        # Hidden-point culling: each slot gets an element buffer with its points in direction
+        # tile order (built in the background), and only the tiles facing the camera are drawn
+        self.cull_hidden = cull_hidden
+        self.cull_tiles_per_face = 16
+        self.max_cull_points = 8_000_000  # Larger batches are drawn without culling
+        self._cull_drawn = None  # Fraction of the batch drawn in the last culled frame
+        
+        # Streaming batch management
         self.current_batch_offset = 0  # Current position in point generation
-        self.needs_buffer_update = True
+        self._last_cycle_t = 0.0
+        
+        # Per-stage timing of every frame; print_stage_timing dumps a report to the console
+        # every stage_report_interval seconds
+        self.stage_timer = StageTimer()
+        self.print_stage_timing = False
+        self.stage_report_interval = 2.0
+        self._last_stage_report_t = time.time()
+        
+        # Recording: frames are read back into alternating pixel-pack buffers and mapped one
+        # frame later, so glReadPixels never waits for the GPU; a frame is dropped when the
+        # writer has no free buffer instead of stalling the viewer
+        self.record_dir = 'collatz_recordings'
+        self.record_format = 'png'
+        self.recording = False
+        self.record_writer = None
+        self.record_pbos = None
+        self.record_pending = None  # Index of the pixel-pack buffer read back last frame
+        self.record_frame = 0  # Frames handed to the writer
+        self.record_dropped = 0
+        self._record_path = None
+        
+        # CPU time of the last display() call and the part of it spent updating GPU data
+        # (attribute buffers and uniforms), in seconds
+        self.last_frame_times = {'cpu': 0.0, 'upload': 0.0}
         
         # FPS tracking
         self._frame_count = 0
         self._last_fps_t = time.time()
         self._fps = 0.0
 
-    def initialize_pygame_and_opengl(self):
-        """Initialize Pygame and OpenGL context with MSAA"""
+    def initialize_pygame_and_opengl(self, hidden=False):
+        """Initialize Pygame and OpenGL context with MSAA; a hidden window is enough for benchmarks"""
         pygame.init()
         
         # GL attributes
@@ -72,7 +258,7 @@ class CollatzSphereViewer:
         pygame.display.gl_set_attribute(pygame.GL_MULTISAMPLEBUFFERS, 1)
         pygame.display.gl_set_attribute(pygame.GL_MULTISAMPLESAMPLES, 4)
         
-        pygame.display.set_mode((self.width, self.height), DOUBLEBUF | OPENGL)
+        pygame.display.set_mode((self.width, self.height), DOUBLEBUF | OPENGL | (pygame.HIDDEN if hidden else 0))
         pygame.display.set_caption("Collatz Sphere - Interactive")
         
         pygame.display.flip()
@@ -87,38 +273,32 @@ class CollatzSphereViewer:
         print(f"Renderer: {glGetString(GL_RENDERER).decode()}")
 
     def create_shaders(self):
-        """Create and compile shaders with Collatz calculation on GPU"""
-        vertex_shader = r"""
-        #version 330 core
-        layout(location = 0) in float index;
-        
-        uniform mat4 projection;
-        uniform mat4 view;
-        uniform mat4 model;
-        uniform float point_count;
-        uniform float scale_exponent;
-        uniform int max_iterations;
-        uniform float point_size;
-        uniform float rotation_x;
-        uniform float rotation_y;
-        uniform float batch_offset;
-        
-        out vec3 FragPos;
-        out float Steps;
-        out float MaxValue;
-        out float ConvergenceSpeed;
-        out float Converged;
+        """Create and compile the attribute pass (Collatz calculation on GPU) and the render shaders"""
+        # Shared by both programs, so the attribute pass and the render pass place points identically
+        sphere_point_source = r"""
+        uniform uint point_count;
+        uniform int batch_offset;
         
         const float PI = 3.14159265359;
-        const float PHI = 1.61803398875;
+        const uint PHI_FRACTION = 0x9E3779B9u;  // fract(PHI) * 2^32
+        
+        // Point index from the vertex id; integer, so exact for any point count.
+        // A stride above 1 walks an evenly spread subset of the lattice
+        uint point_index(int stride) {
+            return uint(gl_VertexID) * uint(stride) + uint(batch_offset);
+        }
         
         // Generate sphere point using Fibonacci lattice (improved distribution)
-        vec3 generate_sphere_point(float idx) {
-            float n = point_count;
+        vec3 generate_sphere_point(uint idx) {
+            // fract(idx * PHI) in 32-bit fixed point; the wrapping multiply keeps it exact
+            float theta = 2.0 * PI * (float(idx * PHI_FRACTION) / 4294967296.0);
             
-            // Better distribution for high point counts
-            float theta = 2.0 * PI * fract(idx * PHI);
-            float phi = acos(1.0 - 2.0 * (idx + 0.5) / n);  // Added 0.5 offset for better poles
+            // cos(phi) = 1 - (2 idx + 1) / n, with the 0.5 offset for better poles. The
+            // numerator is formed in integers, so only the final division rounds and cos(phi)
+            // is within an ulp of its float32 value. That ulp is the limit: above 2^24 points,
+            // neighbouring indices near the poles can share a latitude (theta still differs)
+            int offset_from_pole = int(point_count) - int(2u * idx + 1u);
+            float phi = acos(clamp(float(offset_from_pole) / float(point_count), -1.0, 1.0));
             
             float sin_phi = sin(phi);
             vec3 p;
@@ -128,7 +308,18 @@ class CollatzSphereViewer:
             
             return normalize(p);  // Ensure unit sphere
         }
+        """
         
+        # Runs once per parameter change with the rasterizer off; transform feedback captures
+        # the Collatz attributes of every point into an attribute buffer
+        attribute_shader = r"""
+        #version 330 core
+        uniform float scale_exponent;
+        uniform int max_iterations;
+        
+        out vec4 Attributes;  // steps, max value, convergence speed, converged
+        flat out uint PointId;
+        """ + sphere_point_source + r"""
         // Map 3D position to Collatz number (with overflow protection)
         int position_to_number(vec3 pos) {
             float r = length(pos);
@@ -158,11 +349,11 @@ class CollatzSphereViewer:
         }
         
         // Calculate Collatz properties (with better overflow handling)
-        void calculate_collatz(int n) {
-            Steps = 0.0;
-            MaxValue = float(n);
-            ConvergenceSpeed = 0.0;
-            Converged = 0.0;
+        vec4 calculate_collatz(int n) {
+            float Steps = 0.0;
+            float MaxValue = float(n);
+            float ConvergenceSpeed = 0.0;
+            float Converged = 0.0;
             
             int current = n;
             int first_decrease_step = -1;
@@ -205,12 +396,65 @@ class CollatzSphereViewer:
                 if (current < 1) break;
                 if (current > 1000000000) break;
             }
+            
+            return vec4(Steps, MaxValue, ConvergenceSpeed, Converged);
         }
         
         void main() {
-            // Add batch offset to index for streaming mode
-            float effective_index = index + batch_offset;
-            vec3 sphere_pos = generate_sphere_point(effective_index);
+            PointId = point_index(1);
+            vec3 sphere_pos = generate_sphere_point(PointId);
+            
+            // The number only depends on the radius, so the attributes do not change with rotation
+            int n = position_to_number(sphere_pos);
+            Attributes = calculate_collatz(n);
+        }
+        """
+        
+        # Progressive mode: pass only converged points on, so transform feedback appends
+        # a compacted (attributes, point id) record per visible point
+        compact_shader = r"""
+        #version 330 core
+        layout(points) in;
+        layout(points, max_vertices = 1) out;
+        
+        in vec4 Attributes[];
+        flat in uint PointId[];
+        
+        out vec4 CompactAttributes;
+        flat out uint CompactPointId;
+        
+        void main() {
+            if (Attributes[0].w > 0.5) {
+                CompactAttributes = Attributes[0];
+                CompactPointId = PointId[0];
+                EmitVertex();
+                EndPrimitive();
+            }
+        }
+        """
+        
+        vertex_shader = r"""
+        #version 330 core
+        layout(location = 1) in vec4 attributes;
+        layout(location = 2) in uint point_id;  // Only read for compacted buffers
+        
+        uniform bool compacted;
+        uniform int draw_stride;  // Adaptive point budget: draw every draw_stride-th point
+        uniform mat4 projection;
+        uniform mat4 view;
+        uniform mat4 model;
+        uniform float point_size;
+        uniform float rotation_x;
+        uniform float rotation_y;
+        
+        out vec3 FragPos;
+        out float Steps;
+        out float MaxValue;
+        out float ConvergenceSpeed;
+        out float Converged;
+        """ + sphere_point_source + r"""
+        void main() {
+            vec3 sphere_pos = generate_sphere_point(compacted ? point_id : point_index(draw_stride));
             
             // Apply rotation to sphere
             float rx = rotation_x;
@@ -233,9 +477,11 @@ class CollatzSphereViewer:
             sphere_pos = rot_y * rot_x * sphere_pos;
             FragPos = sphere_pos;
             
-            // Calculate Collatz properties
-            int n = position_to_number(sphere_pos);
-            calculate_collatz(n);
+            // Collatz properties precomputed by the attribute pass
+            Steps = attributes.x;
+            MaxValue = attributes.y;
+            ConvergenceSpeed = attributes.z;
+            Converged = attributes.w;
             
             // Only show converged points
             if (Converged > 0.5) {
@@ -313,65 +559,116 @@ class CollatzSphereViewer:
             vs = shaders.compileShader(vertex_shader, GL_VERTEX_SHADER)
             fs = shaders.compileShader(fragment_shader, GL_FRAGMENT_SHADER)
             self.shader_program = shaders.compileProgram(vs, fs)
+            self.attribute_program = self._link_feedback_program(attribute_shader, ['Attributes'])
+            self.compact_program = self._link_feedback_program(
+                attribute_shader, ['CompactAttributes', 'CompactPointId'], compact_shader)
             self._cache_uniforms()
             print("Shaders compiled successfully")
         except Exception as e:
             print(f"Shader compilation failed: {e}")
             raise
 
+    def _link_feedback_program(self, vertex_source, varyings, geometry_source=None):
+        """Link a program without fragment stage whose outputs are captured with transform feedback"""
+        stages = [shaders.compileShader(vertex_source, GL_VERTEX_SHADER)]
+        if geometry_source:
+            stages.append(shaders.compileShader(geometry_source, GL_GEOMETRY_SHADER))
+        program = glCreateProgram()
+        for stage in stages:
+            glAttachShader(program, stage)
+        
+        # Captured outputs have to be declared before linking
+        names = (ctypes.c_char_p * len(varyings))(*[name.encode() for name in varyings])
+        glTransformFeedbackVaryings(program, len(varyings),
+                                    ctypes.cast(names, ctypes.POINTER(ctypes.POINTER(GLchar))),
+                                    GL_INTERLEAVED_ATTRIBS)
+        glLinkProgram(program)
+        for stage in stages:
+            glDeleteShader(stage)
+        
+        if glGetProgramiv(program, GL_LINK_STATUS) != GL_TRUE:
+            log = glGetProgramInfoLog(program)
+            glDeleteProgram(program)
+            raise RuntimeError(f"Attribute program link failed: {log.decode() if isinstance(log, bytes) else log}")
+        return program
+
     def _cache_uniforms(self):
         """Cache uniform locations for efficiency"""
         names = [
-            'projection', 'view', 'model', 'point_count', 'scale_exponent',
-            'max_iterations', 'point_size', 'color_mode', 'rotation_x', 'rotation_y', 'batch_offset'
+            'projection', 'view', 'model', 'point_count',
+            'max_iterations', 'point_size', 'color_mode', 'rotation_x', 'rotation_y', 'batch_offset',
+            'compacted', 'draw_stride'
         ]
         for name in names:
             self.uniforms[name] = glGetUniformLocation(self.shader_program, name)
+        
+        for name in ['point_count', 'scale_exponent', 'max_iterations', 'batch_offset']:
+            self.attribute_uniforms[name] = glGetUniformLocation(self.attribute_program, name)
+            self.compact_uniforms[name] = glGetUniformLocation(self.compact_program, name)
 
     def create_vertex_buffer(self):
-        """Create VBO with streaming support for large point counts"""
+        """Create the attribute buffers, sized for all points or one streaming batch"""
         # Determine if we actually need streaming mode
         needs_streaming = self.use_streaming and self.point_count > self.ram_buffer_size
         
         if needs_streaming:
             # Use buffer size for GPU, but track total points separately
             effective_count = self.ram_buffer_size
-            indices = np.arange(effective_count, dtype=np.float32)
         else:
             # Use all points directly (no streaming needed)
             effective_count = self.point_count
-            indices = np.arange(effective_count, dtype=np.float32)
             self.use_streaming = False  # Disable streaming for smaller datasets
         
-        if self.vao:
-            glDeleteVertexArrays(1, [self.vao])
-        if self.vbo:
-            glDeleteBuffers(1, [self.vbo])
+        self.delete_vertex_buffers()
+        self.vertex_count = effective_count
         
-        self.vao = glGenVertexArrays(1)
-        glBindVertexArray(self.vao)
+        # Static mode needs one buffer; streaming rotates through several so the next
+        # batches are prepared while the current one is drawn
+        slot_count = self.stream_buffer_count if needs_streaming else 1
+        self.attribute_slots = [self._create_attribute_slot() for _ in range(slot_count)]
+        self.display_slot = None
         
-        self.vbo = glGenBuffers(1)
-        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
-        glBufferData(GL_ARRAY_BUFFER, indices.nbytes, indices, GL_DYNAMIC_DRAW if needs_streaming else GL_STATIC_DRAW)
+        # The attribute pass has no vertex inputs; core profile still needs a bound vertex array
+        self.attribute_vao = glGenVertexArrays(1)
+        self.current_batch_offset = 0
         
-        glVertexAttribPointer(0, 1, GL_FLOAT, GL_FALSE, 0, ctypes.c_void_p(0))
-        glEnableVertexAttribArray(0)
+        if needs_streaming:
+            print(f"Created {slot_count} streaming attribute buffers with {self.vertex_count} GPU points, "
+                  f"{self.point_count} total points")
+        else:
+            print(f"Created static attribute buffer with {self.vertex_count} points")
+
+    def _create_attribute_slot(self):
+        """One attribute buffer (a vec4 of Collatz attributes per point) and the vertex array drawing it"""
+        vbo = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, vbo)
+        glBufferData(GL_ARRAY_BUFFER, self.vertex_count * 16, None, GL_DYNAMIC_COPY)
+        
+        vao = glGenVertexArrays(1)
+        glBindVertexArray(vao)
+        glVertexAttribPointer(1, 4, GL_FLOAT, GL_FALSE, 0, ctypes.c_void_p(0))
+        glEnableVertexAttribArray(1)
         
         glBindVertexArray(0)
-        self.vertex_count = len(indices)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
         
-        # Initialize RAM buffer only if actually streaming
-        if needs_streaming:
-            self.ram_buffer = np.zeros(self.ram_buffer_size, dtype=np.float32)
-            self.current_batch_offset = 0
-            self.needs_buffer_update = True
-            print(f"Created streaming vertex buffer with {self.vertex_count} GPU points, {self.point_count} total points")
-        else:
-            self.ram_buffer = None
-            self.current_batch_offset = 0
-            self.needs_buffer_update = False
-            print(f"Created static vertex buffer with {self.vertex_count} points")
+        # key: BatchKey of the attributes held, pending: (key, future) of a CPU batch on its way,
+        # cull: (CullKey, tiles, level counts) of the element buffer ebo, cull_pending: (CullKey, future)
+        return {'vbo': vbo, 'vao': vao, 'key': None, 'pending': None,
+                'ebo': None, 'cull': None, 'cull_pending': None}
+
+    def delete_vertex_buffers(self):
+        """Release the attribute buffers and the vertex arrays"""
+        for slot in self.attribute_slots:
+            glDeleteVertexArrays(1, [slot['vao']])
+            glDeleteBuffers(1, [slot['vbo']])
+            if slot['ebo'] is not None:
+                glDeleteBuffers(1, [slot['ebo']])
+        if self.attribute_vao:
+            glDeleteVertexArrays(1, [self.attribute_vao])
+        self.attribute_slots = []
+        self.display_slot = None
+        self.attribute_vao = None
 
     def init_gl(self):
         """Initialize OpenGL settings"""
@@ -385,59 +682,402 @@ class CollatzSphereViewer:
         
         self.create_shaders()
         self.create_vertex_buffer()
+        self.progressive_query = int(glGenQueries(1)[0])
         print("OpenGL initialization complete")
 
-    def update_streaming_buffer(self):
-        """Update the RAM buffer with new point batch for streaming mode"""
-        if not self.use_streaming or self.ram_buffer is None:
-            return
-            
-        # Calculate which batch of points to generate
-        batch_start = self.current_batch_offset
-        batch_end = min(batch_start + self.ram_buffer_size, self.point_count)
-        batch_size = batch_end - batch_start
+    def batch_key(self, batch_offset):
+        """Everything a batch's Collatz attributes depend on; rotation and camera are not part of it"""
+        return BatchKey(self.compute_backend, self.point_count, self.scale_exponent,
+                        self.max_iterations, batch_offset, self.vertex_count)
+
+    @staticmethod
+    def batch_point_count(key):
+        """Number of valid points in a batch (the last streaming batch may be short)"""
+        return max(0, min(key.vertex_count, key.point_count - key.batch_offset))
+
+    def next_batch_offset(self, batch_offset):
+        """Offset of the streaming batch after batch_offset, wrapping around at the end"""
+        batch_offset += self.ram_buffer_size
+        return 0 if batch_offset >= self.point_count else batch_offset
+
+    def wanted_batches(self):
+        """Keys of the batch to draw and of the batches to prepare after it, in priority order"""
+        if not self.use_streaming:
+            return [self.batch_key(0)]
         
-        if batch_size <= 0:
-            return
-            
-        # Generate new indices for this batch  
-        new_indices = np.arange(batch_start, batch_end, dtype=np.float32)
+        keys = []
+        batch_offset = self.current_batch_offset
+        for _ in self.attribute_slots:
+            key = self.batch_key(batch_offset)
+            if key in keys:
+                break  # Fewer batches than buffers
+            keys.append(key)
+            batch_offset = self.next_batch_offset(batch_offset)
+        return keys
+
+    def compute_attributes(self, slot, key):
+        """Evaluate the Collatz attributes of a batch once, via transform feedback into a slot"""
+        # Orphan the old storage so the pass never waits on draws still reading it
+        glBindBuffer(GL_ARRAY_BUFFER, slot['vbo'])
+        glBufferData(GL_ARRAY_BUFFER, self.vertex_count * 16, None, GL_DYNAMIC_COPY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
         
-        # Copy to RAM buffer (pad with zeros if needed)
-        if batch_size < len(self.ram_buffer):
-            self.ram_buffer[:batch_size] = new_indices
-            self.ram_buffer[batch_size:] = 0  # Hide unused points
-        else:
-            self.ram_buffer[:] = new_indices[:len(self.ram_buffer)]
-            
-        self.buffer_valid_count = batch_size
-        self.needs_buffer_update = False
+        glUseProgram(self.attribute_program)
+        glUniform1ui(self.attribute_uniforms['point_count'], key.point_count)
+        glUniform1f(self.attribute_uniforms['scale_exponent'], float(key.scale_exponent))
+        glUniform1i(self.attribute_uniforms['max_iterations'], key.max_iterations)
+        glUniform1i(self.attribute_uniforms['batch_offset'], key.batch_offset)
         
-        print(f"Updated streaming buffer: points {batch_start}-{batch_end-1} ({batch_size} points)")
+        # No fragments are needed, only the captured vertex outputs
+        glEnable(GL_RASTERIZER_DISCARD)
+        glBindBufferBase(GL_TRANSFORM_FEEDBACK_BUFFER, 0, slot['vbo'])
+        glBindVertexArray(self.attribute_vao)
+        glBeginTransformFeedback(GL_POINTS)
+        glDrawArrays(GL_POINTS, 0, self.batch_point_count(key))
+        glEndTransformFeedback()
+        glBindVertexArray(0)
+        glBindBufferBase(GL_TRANSFORM_FEEDBACK_BUFFER, 0, 0)
+        glDisable(GL_RASTERIZER_DISCARD)
+        
+        slot['key'] = key
 
-    def upload_buffer_to_gpu(self):
-        """Upload the current RAM buffer to GPU"""
-        if not self.use_streaming or self.ram_buffer is None:
-            return
-            
-        # Upload the buffer data to GPU
-        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
-        glBufferSubData(GL_ARRAY_BUFFER, 0, self.ram_buffer.nbytes, self.ram_buffer)
+    def refresh_attributes(self):
+        """Keep the slots filled with the batch on screen and the batches that follow it"""
+        self._collect_cpu_batches()
+        wanted = self.wanted_batches()
+        
+        for key in wanted:
+            if any(slot['key'] == key or (slot['pending'] and slot['pending'][0] == key)
+                   for slot in self.attribute_slots):
+                continue
+            slot = self._free_slot(wanted)
+            if slot is None:
+                break
+            if key.backend == 'gpu':
+                self.compute_attributes(slot, key)
+            else:
+                self._submit_cpu_batch(slot, key)
+        
+        # Draw the wanted batch once it is ready; until then keep drawing the previous one
+        for index, slot in enumerate(self.attribute_slots):
+            if slot['key'] == wanted[0]:
+                self.display_slot = index
+
+    def _free_slot(self, wanted):
+        """A slot that may be overwritten: not on screen, not awaiting a batch, not holding a wanted one"""
+        candidates = [
+            index for index, slot in enumerate(self.attribute_slots)
+            if slot['pending'] is None and slot['key'] not in wanted
+        ]
+        # Only a single static buffer is ever replaced while on screen
+        off_screen = [index for index in candidates if index != self.display_slot]
+        if off_screen:
+            return self.attribute_slots[off_screen[0]]
+        if candidates and len(self.attribute_slots) == 1:
+            return self.attribute_slots[candidates[0]]
+        return None
+
+    def _executor(self):
+        """Background process for CPU work, started on first use"""
+        if self.attribute_executor is None:
+            # Spawned rather than forked so the worker does not inherit the GL context
+            self.attribute_executor = ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context('spawn'))
+        return self.attribute_executor
+
+    def _reset_executor(self):
+        """Drop the background process pool; the next _executor() call starts a new one"""
+        if self.attribute_executor is not None:
+            self.attribute_executor.shutdown(wait=False, cancel_futures=True)
+            self.attribute_executor = None
+
+    def _submit(self, fn, *args):
+        """Run fn(*args) in the background process, replacing a pool broken by a dead worker"""
+        try:
+            return self._executor().submit(fn, *args)
+        except BrokenProcessPool:
+            self._reset_executor()
+            return self._executor().submit(fn, *args)
+
+    def _submit_cpu_batch(self, slot, key):
+        """Queue a batch for the exact CPU backend; its result lands in the slot when done"""
+        start = key.batch_offset
+        stop = start + self.batch_point_count(key)
+        future = self._submit(
+            compute_sphere_attributes, key.point_count, start, stop,
+            key.scale_exponent, key.max_iterations)
+        slot['pending'] = (key, future)
+
+    def _collect_cpu_batches(self):
+        """Upload every CPU batch that finished since the last frame"""
+        for slot in self.attribute_slots:
+            if slot['pending'] is None or not slot['pending'][1].done():
+                continue
+            key, future = slot['pending']
+            slot['pending'] = None
+            try:
+                attributes = future.result()
+            except Exception as e:
+                print(f"CPU attribute computation failed, falling back to GPU: {e}")
+                if isinstance(e, BrokenProcessPool):
+                    self._reset_executor()
+                self.set_compute_backend('gpu')
+                continue
+            self.upload_attributes(slot, attributes)
+            slot['key'] = key
+
+    def upload_attributes(self, slot, attributes):
+        """Upload a CPU-computed (n, 4) float32 attribute block into a slot"""
+        attributes = np.ascontiguousarray(attributes[:self.vertex_count], dtype=np.float32)
+        glBindBuffer(GL_ARRAY_BUFFER, slot['vbo'])
+        # Orphan first, so a buffer the GPU may still be drawing from is never waited on
+        glBufferData(GL_ARRAY_BUFFER, self.vertex_count * 16, None, GL_DYNAMIC_COPY)
+        glBufferSubData(GL_ARRAY_BUFFER, 0, attributes.nbytes, attributes)
         glBindBuffer(GL_ARRAY_BUFFER, 0)
 
+    def refresh_cull_index(self, slot):
+        """
+        Tile index of the batch in a slot, or None while it is being built (or culling does
+        not apply). The index only depends on which lattice points the slot holds, so it
+        survives attribute changes such as a new scale exponent.
+        """
+        if slot['key'] is None:
+            return None
+        count = self.batch_point_count(slot['key'])
+        if count > self.max_cull_points:
+            return None
+        cull_key = CullKey(slot['key'].point_count, slot['key'].batch_offset, count)
+        
+        if slot['cull_pending'] is not None and slot['cull_pending'][1].done():
+            pending_key, future = slot['cull_pending']
+            slot['cull_pending'] = None
+            try:
+                tiles, level_counts = future.result()
+            except Exception as e:
+                print(f"Building the cull index failed, culling disabled: {e}")
+                if isinstance(e, BrokenProcessPool):
+                    self._reset_executor()
+                self.cull_hidden = False
+                return None
+            if slot['ebo'] is None:
+                slot['ebo'] = glGenBuffers(1)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, slot['ebo'])
+            glBufferData(GL_ELEMENT_ARRAY_BUFFER, tiles.order.astype(np.uint32), GL_STATIC_DRAW)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+            slot['cull'] = (pending_key, tiles, level_counts)
+        
+        if slot['cull'] is not None and slot['cull'][0] == cull_key:
+            return slot['cull']
+        if slot['cull_pending'] is None:
+            future = self._submit(
+                build_cull_index, cull_key.point_count, cull_key.batch_offset,
+                cull_key.batch_offset + count, self.cull_tiles_per_face, self.max_draw_stride)
+            slot['cull_pending'] = (cull_key, future)
+        return None
+
+    def camera_eye(self):
+        """Camera position in lattice coordinates, undoing the render shader's rotations"""
+        rx, ry = math.radians(self.rotation[0]), math.radians(self.rotation[1])
+        rot_x = np.array([[1, 0, 0], [0, math.cos(rx), math.sin(rx)], [0, -math.sin(rx), math.cos(rx)]])
+        rot_y = np.array([[math.cos(ry), 0, -math.sin(ry)], [0, 1, 0], [math.sin(ry), 0, math.cos(ry)]])
+        return object_space_eye(rot_y @ rot_x, np.negative(self.camera_pos))
+
+    def visible_ranges(self, cull):
+        """(firsts, counts) of the element buffer ranges facing the camera at the current draw stride"""
+        _, tiles, level_counts = cull
+        eye = self.camera_eye()
+        if self.draw_stride == 1:
+            return tiles.visible_ranges(eye)
+        
+        # Tiles stay separate ranges: only their first level_counts points are drawn
+        visible = tiles.visible(eye) & (level_counts[self.draw_stride] > 0)
+        return (tiles.starts[visible].astype(np.int32),
+                level_counts[self.draw_stride][visible].astype(np.int32))
+
+    def set_compute_backend(self, backend):
+        """Switch between the GPU shader pass and the exact CPU evaluation"""
+        self.compute_backend = backend
+        self.scale_exponent = min(self.scale_exponent, self.max_scale_exponent[backend])
+        print(f"Attribute backend: {backend.upper()}")
+
     def cycle_streaming_batch(self):
         """Move to the next batch of points for streaming"""
         if not self.use_streaming:
             return
             
-        # Move to next batch
-        self.current_batch_offset += self.ram_buffer_size
+        # Move to next batch, wrapping around if we've reached the end
+        self.current_batch_offset = self.next_batch_offset(self.current_batch_offset)
+        self._last_cycle_t = time.time()
         
-        # Wrap around if we've reached the end
-        if self.current_batch_offset >= self.point_count:
-            self.current_batch_offset = 0
-            
-        self.needs_buffer_update = True
+        batch_end = min(self.current_batch_offset + self.ram_buffer_size, self.point_count)
+        print(f"Streaming batch: points {self.current_batch_offset}-{batch_end-1}")
+
+    def _auto_cycle_batches(self):
+        """In auto-cycle mode, advance to the next batch once it is prepared, so cycling never stalls"""
+        if not (self.use_streaming and self.auto_cycle):
+            return
+        if time.time() - self._last_cycle_t < self.auto_cycle_interval:
+            return
+        
+        next_key = self.batch_key(self.next_batch_offset(self.current_batch_offset))
+        if any(slot['key'] == next_key for slot in self.attribute_slots):
+            self.cycle_streaming_batch()
+
+    def set_progressive(self, enabled):
+        """Turn progressive accumulation on or off; turning it off releases the compacted buffer"""
+        self.progressive = enabled
+        self.progressive_key = None  # Restart from the first batch on the next frame
+        if not enabled:
+            self.delete_progressive_buffer()
+        print(f"Progressive mode: {'ON' if enabled else 'OFF'}")
+
+    def delete_progressive_buffer(self):
+        """Release the compacted buffer and its vertex array"""
+        if self.progressive_vao:
+            glDeleteVertexArrays(1, [self.progressive_vao])
+        if self.progressive_vbo:
+            glDeleteBuffers(1, [self.progressive_vbo])
+        self.progressive_vao = self.progressive_vbo = None
+        self.progressive_capacity = 0
+        self.progressive_count = 0
+
+    def refresh_progressive(self):
+        """Compute the next batch and append its converged points, one batch per frame"""
+        key = self.batch_key(0)._replace(vertex_count=self.ram_buffer_size)
+        if key != self.progressive_key:
+            # New parameters: start over (a CPU batch still in flight is dropped)
+            self.progressive_key = key
+            self.progressive_count = 0
+            self.progressive_next_offset = 0
+            self.progressive_pending = None
+            self.progressive_full = False
+        
+        if self.progressive_pending is not None:
+            self._collect_progressive_batch()
+            return
+        if self.progressive_full or self.progressive_next_offset >= key.point_count:
+            return
+        
+        batch = key._replace(batch_offset=self.progressive_next_offset)
+        count = self.batch_point_count(batch)
+        if not self._reserve_progressive(count):
+            return
+        
+        if key.backend == 'gpu':
+            self._compact_batch_gpu(batch, count)
+            self.progressive_next_offset += count
+        else:
+            future = self._submit(
+                compute_sphere_attributes, batch.point_count, batch.batch_offset,
+                batch.batch_offset + count, batch.scale_exponent, batch.max_iterations)
+            self.progressive_pending = (batch, future)
+
+    def _reserve_progressive(self, count):
+        """Grow the compacted buffer to fit count more records, within the memory budget"""
+        budget = self.progressive_budget_mb * 1024 * 1024 // COMPACT_RECORD.itemsize
+        needed = self.progressive_count + count
+        if needed <= self.progressive_capacity:
+            return True
+        if self.progressive_capacity >= budget:
+            self.progressive_full = True
+            print(f"Progressive buffer reached its {self.progressive_budget_mb} MB budget")
+            return False
+        
+        # Double (amortized growth), but never past the budget
+        self._resize_progressive(min(budget, max(needed, 2 * self.progressive_capacity)))
+        return True
+
+    def _resize_progressive(self, capacity):
+        """Move the compacted records into a buffer of the given capacity"""
+        itemsize = COMPACT_RECORD.itemsize
+        vbo = glGenBuffers(1)
+        glBindBuffer(GL_COPY_WRITE_BUFFER, vbo)
+        glBufferData(GL_COPY_WRITE_BUFFER, capacity * itemsize, None, GL_DYNAMIC_COPY)
+        if self.progressive_vbo:
+            if self.progressive_count:
+                glBindBuffer(GL_COPY_READ_BUFFER, self.progressive_vbo)
+                glCopyBufferSubData(GL_COPY_READ_BUFFER, GL_COPY_WRITE_BUFFER, 0, 0,
+                                    self.progressive_count * itemsize)
+                glBindBuffer(GL_COPY_READ_BUFFER, 0)
+            glDeleteBuffers(1, [self.progressive_vbo])
+        glBindBuffer(GL_COPY_WRITE_BUFFER, 0)
+        self.progressive_vbo = vbo
+        self.progressive_capacity = capacity
+        
+        if self.progressive_vao is None:
+            self.progressive_vao = glGenVertexArrays(1)
+        glBindVertexArray(self.progressive_vao)
+        glBindBuffer(GL_ARRAY_BUFFER, vbo)
+        glVertexAttribPointer(1, 4, GL_FLOAT, GL_FALSE, itemsize, ctypes.c_void_p(0))
+        glEnableVertexAttribArray(1)
+        glVertexAttribIPointer(2, 1, GL_UNSIGNED_INT, itemsize, ctypes.c_void_p(16))
+        glEnableVertexAttribArray(2)
+        glBindVertexArray(0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def _compact_batch_gpu(self, batch, count):
+        """Run the attribute pass over a batch, appending only converged points via the geometry stage"""
+        itemsize = COMPACT_RECORD.itemsize
+        free = self.progressive_capacity - self.progressive_count
+        
+        glUseProgram(self.compact_program)
+        glUniform1ui(self.compact_uniforms['point_count'], batch.point_count)
+        glUniform1f(self.compact_uniforms['scale_exponent'], float(batch.scale_exponent))
+        glUniform1i(self.compact_uniforms['max_iterations'], batch.max_iterations)
+        glUniform1i(self.compact_uniforms['batch_offset'], batch.batch_offset)
+        
+        glEnable(GL_RASTERIZER_DISCARD)
+        glBindBufferRange(GL_TRANSFORM_FEEDBACK_BUFFER, 0, self.progressive_vbo,
+                          self.progressive_count * itemsize, free * itemsize)
+        glBindVertexArray(self.attribute_vao)
+        glBeginQuery(GL_TRANSFORM_FEEDBACK_PRIMITIVES_WRITTEN, self.progressive_query)
+        glBeginTransformFeedback(GL_POINTS)
+        glDrawArrays(GL_POINTS, 0, count)
+        glEndTransformFeedback()
+        glEndQuery(GL_TRANSFORM_FEEDBACK_PRIMITIVES_WRITTEN)
+        glBindVertexArray(0)
+        glBindBufferBase(GL_TRANSFORM_FEEDBACK_BUFFER, 0, 0)
+        glDisable(GL_RASTERIZER_DISCARD)
+        
+        # How many points survived; waits for this batch only
+        written = int(glGetQueryObjectuiv(self.progressive_query, GL_QUERY_RESULT))
+        self.progressive_count += written
+        if free < count and written == free:
+            self.progressive_full = True
+            print(f"Progressive buffer reached its {self.progressive_budget_mb} MB budget")
+
+    def _collect_progressive_batch(self):
+        """Append the converged points of a finished CPU batch"""
+        batch, future = self.progressive_pending
+        if not future.done():
+            return
+        self.progressive_pending = None
+        try:
+            attributes = future.result()
+        except Exception as e:
+            print(f"CPU attribute computation failed, falling back to GPU: {e}")
+            if isinstance(e, BrokenProcessPool):
+                self._reset_executor()
+            self.set_compute_backend('gpu')
+            return
+        
+        converged = np.flatnonzero(attributes[:, 3] > 0.5)
+        records = np.empty(len(converged), dtype=COMPACT_RECORD)
+        records['attributes'] = attributes[converged]
+        records['point_id'] = batch.batch_offset + converged
+        
+        free = self.progressive_capacity - self.progressive_count
+        if len(records) > free:
+            records = records[:free]
+            self.progressive_full = True
+            print(f"Progressive buffer reached its {self.progressive_budget_mb} MB budget")
+        
+        glBindBuffer(GL_ARRAY_BUFFER, self.progressive_vbo)
+        glBufferSubData(GL_ARRAY_BUFFER, self.progressive_count * COMPACT_RECORD.itemsize,
+                        records.nbytes, records)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        self.progressive_count += len(records)
+        self.progressive_next_offset = batch.batch_offset + len(attributes)
 
     def get_projection_matrix(self):
         """Create projection matrix"""
@@ -464,10 +1104,15 @@ class CollatzSphereViewer:
 
     def display(self):
         """Render frame with streaming support"""
-        # Update streaming buffer if needed
-        if self.use_streaming and self.ram_buffer is not None and self.needs_buffer_update:
-            self.update_streaming_buffer()
-            self.upload_buffer_to_gpu()
+        timer = self.stage_timer
+        
+        # Collatz attributes only change with the point set and mapping parameters
+        if self.progressive:
+            self.refresh_progressive()
+        else:
+            self._auto_cycle_batches()
+            self.refresh_attributes()
+        timer.mark('refresh')
         
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
         glUseProgram(self.shader_program)
@@ -477,21 +1122,38 @@ class CollatzSphereViewer:
         view = self.get_view_matrix()
         model = np.eye(4, dtype=np.float32)  # Identity matrix
         
-        # Determine what to render
-        if self.use_streaming and self.ram_buffer is not None:
-            # Streaming mode: render the current batch
-            effective_point_count = min(self.buffer_valid_count, self.vertex_count)
-            batch_offset = self.current_batch_offset
+        # Render the batch held by the slot on screen (all points in static mode),
+        # or every converged point accumulated so far in progressive mode
+        slot = self.attribute_slots[self.display_slot] if self.display_slot is not None else None
+        if self.progressive:
+            vao, vbo = self.progressive_vao, self.progressive_vbo
+            effective_point_count = self.progressive_count
+            batch_offset = 0
+            total_points = self.progressive_key.point_count
+        elif slot is not None and slot['key'] is not None:
+            key = slot['key']
+            vao, vbo = slot['vao'], slot['vbo']
+            effective_point_count = self.batch_point_count(key)
+            batch_offset = key.batch_offset
+            total_points = key.point_count
         else:
-            # Static mode: render all points directly
-            effective_point_count = self.vertex_count
-            batch_offset = 0.0
+            effective_point_count = 0  # Nothing computed yet
+            batch_offset = 0
+            total_points = self.point_count
+        
+        # Culling draws the slot's points through its tile-ordered element buffer, in which
+        # the draw stride is already accounted for
+        cull = None
+        if self.cull_hidden and not self.progressive and slot is not None:
+            cull = self.refresh_cull_index(slot)
+        draw_stride = 1 if cull is not None else self.draw_stride
+        
+        timer.mark('setup')
         
         glUniformMatrix4fv(self.uniforms['projection'], 1, GL_TRUE, proj)
         glUniformMatrix4fv(self.uniforms['view'], 1, GL_TRUE, view)
         glUniformMatrix4fv(self.uniforms['model'], 1, GL_TRUE, model)
-        glUniform1f(self.uniforms['point_count'], float(self.point_count))  # Total points for generation
-        glUniform1f(self.uniforms['scale_exponent'], float(self.scale_exponent))
+        glUniform1ui(self.uniforms['point_count'], total_points)  # Total points for generation
         glUniform1i(self.uniforms['max_iterations'], self.max_iterations)
         glUniform1f(self.uniforms['point_size'], self.point_size)
         glUniform1i(self.uniforms['color_mode'], self.color_mode)
@@ -499,15 +1161,152 @@ class CollatzSphereViewer:
         glUniform1f(self.uniforms['rotation_y'], math.radians(self.rotation[1]))
         
         # Add batch offset uniform (always set, even if 0)
-        glUniform1f(self.uniforms['batch_offset'], float(batch_offset))
+        glUniform1i(self.uniforms['batch_offset'], batch_offset)
+        glUniform1i(self.uniforms['compacted'], int(self.progressive))
+        glUniform1i(self.uniforms['draw_stride'], draw_stride)
+        timer.mark('uniforms')
         
         # Draw points
-        glBindVertexArray(self.vao)
-        glDrawArrays(GL_POINTS, 0, effective_point_count)
-        glBindVertexArray(0)
+        if effective_point_count:
+            glBindVertexArray(vao)
+            self._set_record_stride(vbo, draw_stride)
+            if cull is not None:
+                firsts, counts = self.visible_ranges(cull)
+                self._cull_drawn = counts.sum() * self.draw_stride / effective_point_count
+                glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, slot['ebo'])
+                if len(firsts):
+                    offsets = (ctypes.c_void_p * len(firsts))(*(int(first) * 4 for first in firsts))
+                    glMultiDrawElements(GL_POINTS, counts, GL_UNSIGNED_INT, offsets, len(firsts))
+            else:
+                self._cull_drawn = None
+                glDrawArrays(GL_POINTS, 0, (effective_point_count + draw_stride - 1) // draw_stride)
+            glBindVertexArray(0)
         
+        timer.mark('draw')
+        
+        if self.recording:
+            self.capture_frame()
+            timer.mark('capture')
+        
+        last = timer.last
+        self.last_frame_times = {
+            'cpu': last['refresh'] + last['setup'] + last['uniforms'] + last['draw'],
+            'upload': last['refresh'] + last['uniforms']
+        }
         pygame.display.flip()
+        timer.mark('swap')
         self._update_fps()
+        timer.mark('title')
+
+    def start_recording(self):
+        """Start writing every displayed frame to a new directory under record_dir"""
+        self._record_path = os.path.join(self.record_dir, time.strftime('recording_%Y%m%d_%H%M%S'))
+        self.record_writer = AsyncFrameWriter(
+            self._record_path, self.width, self.height, fmt=self.record_format, threads=1,
+            queue_size=4, on_failed=lambda frame, e: print(f"Error writing frame {frame}: {e}"))
+        
+        frame_bytes = self.width * self.height * 3
+        self.record_pbos = [int(pbo) for pbo in glGenBuffers(2)]
+        for pbo in self.record_pbos:
+            glBindBuffer(GL_PIXEL_PACK_BUFFER, pbo)
+            glBufferData(GL_PIXEL_PACK_BUFFER, frame_bytes, None, GL_STREAM_READ)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        
+        self.record_pending = None
+        self.record_frame = 0
+        self.record_dropped = 0
+        self.recording = True
+        print(f"Recording {self.record_format} frames to {self._record_path}")
+
+    def stop_recording(self):
+        """Hand the last frame to the writer, wait for it to finish and release the buffers"""
+        if not self.recording:
+            return
+        if self.record_pending is not None:
+            self._collect_capture(self.record_pending)
+        self.record_writer.close()
+        glDeleteBuffers(2, self.record_pbos)
+        
+        self.recording = False
+        self.record_writer = None
+        self.record_pbos = None
+        self.record_pending = None
+        print(f"Recording stopped: {self.record_frame} frames written to {self._record_path}, "
+              f"{self.record_dropped} dropped")
+
+    def capture_frame(self):
+        """Queue an asynchronous readback of the frame just drawn and collect the previous one"""
+        index = 0 if self.record_pending is None else 1 - self.record_pending
+        glPixelStorei(GL_PACK_ALIGNMENT, 1)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, self.record_pbos[index])
+        glReadPixels(0, 0, self.width, self.height, GL_RGB, GL_UNSIGNED_BYTE, ctypes.c_void_p(0))
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        
+        # The previous readback had a whole frame to complete, so mapping it does not stall
+        if self.record_pending is not None:
+            self._collect_capture(self.record_pending)
+        self.record_pending = index
+
+    def _collect_capture(self, index):
+        """Copy a finished readback into a writer buffer, or count it as dropped if none is free"""
+        buffer = self.record_writer.acquire_buffer(block=False)
+        if buffer is None:
+            self.record_dropped += 1
+            return
+        
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, self.record_pbos[index])
+        pointer = glMapBufferRange(GL_PIXEL_PACK_BUFFER, 0, buffer.nbytes, GL_MAP_READ_BIT)
+        ctypes.memmove(buffer.ctypes.data, pointer, buffer.nbytes)
+        glUnmapBuffer(GL_PIXEL_PACK_BUFFER)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        
+        # OpenGL rows are bottom-up, the writer flips them
+        self.record_writer.submit(self.record_frame, buffer)
+        self.record_frame += 1
+
+    def _set_record_stride(self, vbo, draw_stride):
+        """Point the bound vertex array at every draw_stride-th record of its buffer"""
+        record_size = COMPACT_RECORD.itemsize if self.progressive else 16
+        stride = record_size * draw_stride
+        glBindBuffer(GL_ARRAY_BUFFER, vbo)
+        glVertexAttribPointer(1, 4, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(0))
+        if self.progressive:
+            glVertexAttribIPointer(2, 1, GL_UNSIGNED_INT, stride, ctypes.c_void_p(16))
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def adapt_point_budget(self, frame_ms):
+        """
+        Adjust draw_stride from the measured frame time. The stride only changes after the
+        smoothed frame time has stayed outside the band around the budget for a while, and
+        finer levels need real headroom since halving the stride doubles the points drawn.
+        """
+        if not self.adaptive:
+            return
+        
+        if self._frame_ms_avg is None:
+            self._frame_ms_avg = frame_ms
+        self._frame_ms_avg += 0.1 * (frame_ms - self._frame_ms_avg)
+        budget_ms = 1000.0 / self.target_fps
+        
+        if self._frame_ms_avg > budget_ms * 1.15:
+            self._over_budget_frames += 1
+            self._under_budget_frames = 0
+        elif self._frame_ms_avg < budget_ms * 0.45:
+            self._under_budget_frames += 1
+            self._over_budget_frames = 0
+        else:
+            self._over_budget_frames = self._under_budget_frames = 0
+        
+        if self._over_budget_frames >= 10 and self.draw_stride < self.max_draw_stride:
+            self.set_draw_stride(self.draw_stride * 2)
+        elif self._under_budget_frames >= 60 and self.draw_stride > 1:
+            self.set_draw_stride(self.draw_stride // 2)
+
+    def set_draw_stride(self, stride):
+        """Change the point budget level and restart the frame time measurement"""
+        self.draw_stride = stride
+        self._frame_ms_avg = None
+        self._over_budget_frames = self._under_budget_frames = 0
 
     def _update_fps(self):
         """Update FPS counter and window title"""
@@ -521,16 +1320,42 @@ class CollatzSphereViewer:
             
             mode_names = ['Steps', 'Max Value', 'Convergence Speed']
             streaming_info = ""
-            if self.use_streaming and self.ram_buffer is not None:
+            if self.progressive:
+                streaming_info = (f" - Accumulated: {self.progressive_count} converged of "
+                                  f"{min(self.progressive_next_offset, self.point_count)}")
+                if self.progressive_full:
+                    streaming_info += " (budget full)"
+            elif self.use_streaming:
                 batch_num = (self.current_batch_offset // self.ram_buffer_size) + 1
                 total_batches = (self.point_count + self.ram_buffer_size - 1) // self.ram_buffer_size
                 streaming_info = f" - Batch: {batch_num}/{total_batches}"
+                if self.auto_cycle:
+                    streaming_info += " (auto)"
+            
+            backend_info = f" - {self.compute_backend.upper()}"
+            if self.adaptive:
+                backend_info += f" - Adaptive: 1/{self.draw_stride} points"
+                if self._frame_ms_avg is not None:
+                    backend_info += f" ({self._frame_ms_avg:.1f} ms)"
+            if self._cull_drawn is not None:
+                backend_info += f" - Culled: {self._cull_drawn:.0%} drawn"
+            if self.recording:
+                backend_info += f" - REC {self.record_frame}"
+                if self.record_dropped:
+                    backend_info += f" ({self.record_dropped} dropped)"
+            on_screen = self.attribute_slots[self.display_slot]['key'] if self.display_slot is not None else None
+            if self.progressive:
+                if self.progressive_pending is not None:
+                    backend_info += " (computing)"
+            elif on_screen != self.wanted_batches()[0]:
+                backend_info += " (computing)"
             
             pygame.display.set_caption(
                 f"Collatz Sphere - FPS: {self._fps:.1f} - "
                 f"Color: {mode_names[self.color_mode]} - "
                 f"Points: {self.point_count} - "
                 f"Scale: 2^{self.scale_exponent:.1f}"
+                f"{backend_info}"
                 f"{streaming_info}"
             )
 
@@ -561,7 +1386,7 @@ class CollatzSphereViewer:
                 self.scale_exponent = max(1.0, self.scale_exponent - 1.0)
                 print(f"Scale exponent: {self.scale_exponent}")
             elif key == pygame.K_EQUALS:
-                self.scale_exponent = min(40.0, self.scale_exponent + 1.0)
+                self.scale_exponent = min(self.max_scale_exponent[self.compute_backend], self.scale_exponent + 1.0)
                 print(f"Scale exponent: {self.scale_exponent}")
             elif key == pygame.K_o:
                 old = self.point_count
@@ -577,20 +1402,44 @@ class CollatzSphereViewer:
                         if not self.use_streaming:
                             print(f"Auto-enabling streaming mode for {self.point_count} points")
                         self.use_streaming = True
-                        self.current_batch_offset = 0
-                        self.needs_buffer_update = True
                     self.create_vertex_buffer()
                     print(f"Point count: {self.point_count}")
+            elif key == pygame.K_g:
+                self.set_compute_backend('cpu' if self.compute_backend == 'gpu' else 'gpu')
             elif key == pygame.K_n:
                 # Cycle to next batch in streaming mode
                 if self.use_streaming:
                     self.cycle_streaming_batch()
+            elif key == pygame.K_m:
+                # Toggle progressive accumulation of every batch
+                self.set_progressive(not self.progressive)
+            elif key == pygame.K_f:
+                # Toggle the adaptive point budget; turning it off draws every point again
+                self.adaptive = not self.adaptive
+                self.set_draw_stride(1)
+                print(f"Adaptive point budget: {'ON' if self.adaptive else 'OFF'} (target {self.target_fps:.0f} FPS)")
+            elif key == pygame.K_h:
+                # Toggle hidden-point culling (not applied to the progressive buffer)
+                self.cull_hidden = not self.cull_hidden
+                print(f"Hidden-point culling: {'ON' if self.cull_hidden else 'OFF'}"
+                      + (" (back-side points seen through gaps are not drawn)" if self.cull_hidden else ""))
+            elif key == pygame.K_i:
+                # Toggle the periodic stage timing report
+                self.print_stage_timing = not self.print_stage_timing
+                print(f"Stage timing report: {'ON' if self.print_stage_timing else 'OFF'}")
+            elif key == pygame.K_v:
+                # Toggle recording of the viewer output
+                if self.recording:
+                    self.stop_recording()
+                else:
+                    self.start_recording()
+            elif key == pygame.K_t:
+                # Toggle automatic batch cycling
+                self.auto_cycle = not self.auto_cycle
+                print(f"Auto batch cycling: {'ON' if self.auto_cycle else 'OFF'}")
             elif key == pygame.K_s:
                 # Toggle streaming mode
                 self.use_streaming = not self.use_streaming
-                if self.use_streaming:
-                    self.needs_buffer_update = True
-                    self.current_batch_offset = 0
                 self.create_vertex_buffer()
                 print(f"Streaming mode: {'ON' if self.use_streaming else 'OFF'}")
             elif key == pygame.K_b:
@@ -616,9 +1465,16 @@ class CollatzSphereViewer:
         print("  A: Toggle auto-rotation")
         print("  Q/E: Decrease/increase point size")
         print("  -/=: Adjust scale exponent")
+        print("  G: Toggle GPU / exact CPU attribute backend")
         print("  O/P: Halve/double point count (auto-enables streaming for large counts)")
         print("  S: Toggle streaming mode")
         print("  N: Next batch (streaming mode)")
+        print("  T: Toggle automatic batch cycling (streaming mode)")
+        print("  M: Toggle progressive mode (accumulate converged points of all batches)")
+        print("  F: Toggle adaptive point budget (holds the target frame rate)")
+        print("  H: Toggle hidden-point culling (skips tiles facing away from the camera; changes the image)")
+        print("  I: Toggle per-stage frame timing report on the console")
+        print(f"  V: Start/stop recording frames ({self.record_format}) to {self.record_dir}")
         print("  B: Increase buffer size (streaming mode)")
         print("  R: Reset view")
         print("  ESC: Quit")
@@ -627,6 +1483,7 @@ class CollatzSphereViewer:
         running = True
         mouse_down = False
         last_mouse_pos = None
+        self.stage_timer.begin()
         
         while running:
             for event in pygame.event.get():
@@ -675,29 +1532,230 @@ class CollatzSphereViewer:
                 self.rotation[0] += self.rotate_speed[0]
                 self.rotation[1] += self.rotate_speed[1]
             
+            # Input handling, including buffer reallocation after point count changes
+            self.stage_timer.mark('events')
+            
             self.display()
             clock.tick(60)
+            self.stage_timer.mark('limiter')
+            # Time spent on the frame itself, without the frame limiter's delay
+            self.adapt_point_budget(clock.get_rawtime())
+            self._report_stage_timing()
+        
+        self.cleanup()
+
+    def _report_stage_timing(self):
+        """Print the stage timing report every stage_report_interval seconds while enabled"""
+        if not self.print_stage_timing:
+            return
+        now = time.time()
+        if now - self._last_stage_report_t >= self.stage_report_interval:
+            self._last_stage_report_t = now
+            print(self.stage_timer.report())
+
+    @staticmethod
+    def benchmark_camera(frame, frames):
+        """Scripted camera of a benchmark frame: two turns around Y while tilting and zooming"""
+        t = frame / frames
+        rotation = [25.0 * math.sin(2 * math.pi * t), 720.0 * t]
+        camera_pos = [0.0, 0.0, 3.0 + 1.0 * math.sin(4 * math.pi * t)]
+        return rotation, camera_pos
+
+    def run_benchmark(self, frames=600, warmup=30, timeout=300.0):
+        """
+        Render the scripted camera path in a hidden window without a frame limiter and
+        return the timings as a dict. Every frame is finished with glFinish, so frame
+        times include the GPU work. Measuring starts once the attributes are computed.
+        """
+        self.initialize_pygame_and_opengl(hidden=True)
+        self.init_gl()
+        self.auto_rotate = False
         
-        # Cleanup
-        if self.vao:
-            glDeleteVertexArrays(1, [self.vao])
-        if self.vbo:
-            glDeleteBuffers(1, [self.vbo])
+        try:
+            # Wait for the batch on screen (CPU backend batches and cull indices are built
+            # in the background), then render a few frames to settle caches and drivers
+            deadline = time.time() + timeout
+            while not self._benchmark_ready():
+                if time.time() > deadline:
+                    raise RuntimeError(f"Attributes not ready after {timeout:.0f} s")
+                self.display()
+                time.sleep(0.01)
+            for _ in range(warmup):
+                self.display()
+            glFinish()
+            self.stage_timer = StageTimer(window=max(1, frames))
+            
+            records = []
+            for frame in range(frames):
+                self.rotation, self.camera_pos = self.benchmark_camera(frame, frames)
+                frame_start = time.perf_counter()
+                self.stage_timer.begin()
+                pygame.event.pump()
+                self.stage_timer.mark('events')
+                self.display()
+                glFinish()
+                self.stage_timer.mark('finish')
+                frame_time = time.perf_counter() - frame_start
+                self.adapt_point_budget(frame_time * 1000.0)
+                records.append({
+                    'frame': frame,
+                    'frame_ms': frame_time * 1000.0,
+                    'cpu_ms': self.last_frame_times['cpu'] * 1000.0,
+                    'upload_ms': self.last_frame_times['upload'] * 1000.0,
+                    'draw_stride': self.draw_stride
+                })
+            
+            def summary(name):
+                values = np.array([record[name] for record in records])
+                return {
+                    'mean': float(values.mean()),
+                    'p50': float(np.percentile(values, 50)),
+                    'p95': float(np.percentile(values, 95)),
+                    'p99': float(np.percentile(values, 99)),
+                    'max': float(values.max())
+                }
+            
+            frame_ms = summary('frame_ms')
+            return {
+                'config': {
+                    'frames': frames,
+                    'warmup': warmup,
+                    'point_count': self.point_count,
+                    'scale_exponent': self.scale_exponent,
+                    'max_iterations': self.max_iterations,
+                    'color_mode': self.color_mode,
+                    'backend': self.compute_backend,
+                    'width': self.width,
+                    'height': self.height,
+                    'streaming': self.use_streaming,
+                    'adaptive': self.adaptive,
+                    'cull_hidden': self.cull_hidden
+                },
+                'renderer': {
+                    'vendor': glGetString(GL_VENDOR).decode(),
+                    'renderer': glGetString(GL_RENDERER).decode(),
+                    'version': glGetString(GL_VERSION).decode()
+                },
+                'summary': {
+                    'fps': 1000.0 / frame_ms['mean'],
+                    'frame_ms': frame_ms,
+                    'cpu_ms': summary('cpu_ms'),
+                    'upload_ms': summary('upload_ms'),
+                    'stages': self.stage_timer.summary(),
+                    'histogram_edges_ms': list(StageTimer.HISTOGRAM_EDGES_MS)
+                },
+                'frames': records
+            }
+        finally:
+            self.cleanup()
+
+    def _benchmark_ready(self):
+        """True once the wanted batch (and its cull index, if culling) is on screen"""
+        if self.display_slot is None:
+            return False
+        slot = self.attribute_slots[self.display_slot]
+        if slot['key'] != self.wanted_batches()[0]:
+            return False
+        if not self.cull_hidden or self.batch_point_count(slot['key']) > self.max_cull_points:
+            return True
+        return self.refresh_cull_index(slot) is not None
+
+    def cleanup(self):
+        """Release every GL object and the background process, then close the window"""
+        self.stop_recording()
+        self.delete_vertex_buffers()
         if self.shader_program:
             glDeleteProgram(self.shader_program)
+        if self.attribute_program:
+            glDeleteProgram(self.attribute_program)
+        self.delete_progressive_buffer()
+        if self.compact_program:
+            glDeleteProgram(self.compact_program)
+        if self.progressive_query:
+            glDeleteQueries(1, [self.progressive_query])
+        self._reset_executor()
         
         pygame.quit()
 
 def main():
+    parser = argparse.ArgumentParser(description='Interactive GPU Collatz sphere viewer')
+    parser.add_argument('--backend', choices=['gpu', 'cpu'], default='gpu',
+                        help='Attribute backend: 32-bit GPU shader pass or exact CPU evaluation')
+    parser.add_argument('--adaptive', action='store_true',
+                        help='Start with the adaptive point budget enabled')
+    parser.add_argument('--target-fps', type=float, default=60.0,
+                        help='Frame rate the adaptive point budget aims for')
+    parser.add_argument('--cull', action='store_true',
+                        help='Start with hidden-point culling enabled. Faster, but changes the image: '
+                             'back-side points that show through the sparse cloud disappear')
+    parser.add_argument('--stage-timing', action='store_true',
+                        help='Print per-stage frame timings to the console every few seconds')
+    parser.add_argument('--record-dir', default='collatz_recordings',
+                        help='Directory recordings (V key) are written to')
+    parser.add_argument('--record-format', choices=FRAME_FORMATS, default='png',
+                        help="Recorded frame format ('raw' writes rgb24 video chunks)")
+    
+    benchmark = parser.add_argument_group(
+        'benchmark', 'Render a scripted camera path in a hidden window and write the frame timings '
+                     'as JSON. Runs offscreen, e.g. SDL_VIDEODRIVER=offscreen PYOPENGL_PLATFORM=egl')
+    benchmark.add_argument('--benchmark', action='store_true', help='Run the benchmark instead of the viewer')
+    benchmark.add_argument('--frames', type=int, default=600, help='Frames to measure')
+    benchmark.add_argument('--warmup', type=int, default=30, help='Frames rendered before measuring')
+    benchmark.add_argument('--points', type=int, help='Point count (streams when above the buffer size)')
+    benchmark.add_argument('--scale', type=float, help='Scale exponent')
+    benchmark.add_argument('--color-mode', type=int, choices=[0, 1, 2],
+                           help='0: steps, 1: max value, 2: convergence speed')
+    benchmark.add_argument('--benchmark-output', default='collatz_benchmark.json',
+                           help="JSON file for the results, '-' for stdout")
+    args = parser.parse_args()
+    if args.frames < 1:
+        parser.error('--frames must be at least 1')
+    
+    # With the results on stdout, every diagnostic line goes to stderr instead
+    json_stdout = args.benchmark and args.benchmark_output == '-'
+    stdout = sys.stdout
+    diagnostics = contextlib.redirect_stdout(sys.stderr) if json_stdout else contextlib.nullcontext()
+    
     try:
-        viewer = CollatzSphereViewer()
-        viewer.run()
+        with diagnostics:
+            viewer = CollatzSphereViewer(compute_backend=args.backend, adaptive=args.adaptive,
+                                         target_fps=args.target_fps, cull_hidden=args.cull)
+            viewer.print_stage_timing = args.stage_timing
+            viewer.record_dir = args.record_dir
+            viewer.record_format = args.record_format
+            if not args.benchmark:
+                viewer.run()
+                return
+            
+            if args.points is not None:
+                viewer.point_count = min(viewer.max_point_count, max(1000, args.points))
+                viewer.use_streaming = viewer.point_count > viewer.ram_buffer_size
+            if args.scale is not None:
+                viewer.scale_exponent = min(viewer.max_scale_exponent[viewer.compute_backend], args.scale)
+            if args.color_mode is not None:
+                viewer.color_mode = args.color_mode
+            
+            results = viewer.run_benchmark(frames=args.frames, warmup=args.warmup)
+            summary = results['summary']['frame_ms']
+            if json_stdout:
+                json.dump(results, stdout, indent=2)
+                stdout.write('\n')
+                stdout.flush()
+            else:
+                with open(args.benchmark_output, 'w') as f:
+                    json.dump(results, f, indent=2)
+                print(f"Benchmark results written to {args.benchmark_output}")
+            print(f"Frame time: p50 {summary['p50']:.2f} ms, p95 {summary['p95']:.2f} ms, "
+                  f"p99 {summary['p99']:.2f} ms ({results['summary']['fps']:.1f} FPS)")
+            if args.stage_timing:
+                print(viewer.stage_timer.report())
     except Exception as e:
-        print(f"Error: {e}")
-        print("\nTroubleshooting:")
-        print("1. Ensure PyOpenGL is installed: pip install PyOpenGL PyOpenGL_accelerate")
-        print("2. Ensure pygame is installed: pip install pygame")
-        print("3. Check graphics drivers are up to date")
+        print(f"Error: {e}", file=sys.stderr)
+        print("\nTroubleshooting:", file=sys.stderr)
+        print("1. Ensure PyOpenGL is installed: pip install PyOpenGL PyOpenGL_accelerate", file=sys.stderr)
+        print("2. Ensure pygame is installed: pip install pygame", file=sys.stderr)
+        print("3. Check graphics drivers are up to date", file=sys.stderr)
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
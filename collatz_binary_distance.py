@@ -1,8 +1,14 @@
+import argparse
 import random
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.colors import LogNorm
 import mpltern
 
+UINT64_MAX = np.iinfo(np.uint64).max
+ALTERNATING_EVEN = np.uint64(0x5555555555555555)  # Bits 0, 2, 4, ...
+ALTERNATING_ODD = np.uint64(0xAAAAAAAAAAAAAAAA)   # Bits 1, 3, 5, ...
+
 def collatz_sequence(n):
     """Generates the Collatz sequence for a given number n."""
     sequence = [n]
@@ -135,10 +141,233 @@ def calculate_convergence_index(n, w1, w2, w3):
     l_distance = calculate_l_distance(binary_string)
     return w1 * p_distance + w2 * m_distance + w3 * l_distance
 
-def plot_triangle_space(numbers):
+def _popcount(values):
+    """Set bits of every element of a uint64 array"""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(values).astype(np.int64)
+    # NumPy < 2.0: count the bits of every byte
+    values = np.ascontiguousarray(values, dtype=np.uint64)
+    bits = np.unpackbits(values.view(np.uint8)).reshape(-1, 64)
+    return bits.sum(axis=1, dtype=np.int64).reshape(values.shape)
+
+def binary_distances(numbers):
+    """
+    P-, M- and L-distances of many numbers at once, as three int64 arrays.
+
+    Same values as the calculate_*_distance functions on bin(n)[2:], computed with bit
+    operations on uint64 instead of strings. Numbers beyond uint64 use the string
+    functions one by one.
+    """
+    values = np.asarray(numbers)
+    if values.dtype == object:
+        fits = np.array([0 <= n <= UINT64_MAX for n in values.ravel()], dtype=bool)
+    else:
+        fits = np.ones(values.size, dtype=bool)
+    values = values.ravel()
+
+    p = np.zeros(len(values), dtype=np.int64)
+    m = np.zeros(len(values), dtype=np.int64)
+    l = np.zeros(len(values), dtype=np.int64)
+
+    n = values[fits].astype(np.uint64)
+    ones = _popcount(n)
+
+    # bin(n) spans every bit up to the highest set one; smear that bit down to get them all
+    span = n.copy()
+    for shift in (1, 2, 4, 8, 16, 32):
+        span |= span >> np.uint64(shift)
+    length = _popcount(span)
+
+    # bin(n) starts with its highest set bit, so P counts the other ones and M the zeros
+    p[fits] = np.maximum(ones - 1, 0)
+    m[fits] = np.where(n == 0, 1, length - ones)
+
+    # L compares against 1010...: a one at every other position, starting at the top bit
+    pattern = np.where(length % 2 == 1, ALTERNATING_EVEN, ALTERNATING_ODD) & span
+    l[fits] = _popcount(n ^ pattern) + (length % 2 == 0) * (n != 0)
+
+    for row in np.flatnonzero(~fits):
+        binary_string = bin(int(values[row]))[2:]
+        p[row] = calculate_p_distance(binary_string)
+        m[row] = calculate_m_distance(binary_string)
+        l[row] = calculate_l_distance(binary_string)
+    return p, m, l
+
+def collatz_sequence_lengths(numbers):
+    """
+    len(collatz_sequence(n)) of many numbers at once, as an int64 array.
+    Trajectories run together in uint64; any that would overflow it are finished as Python ints.
+    """
+    values = np.asarray(numbers).ravel()
+    lengths = np.ones(len(values), dtype=np.int64)
+    if values.dtype == object:
+        fits = np.array([n <= UINT64_MAX for n in values], dtype=bool)
+        for row in np.flatnonzero(~fits):
+            lengths[row] = len(collatz_sequence(int(values[row])))
+        rows = np.flatnonzero(fits)
+        current = values[fits].astype(np.uint64)
+    else:
+        rows = np.arange(len(values))
+        current = values.astype(np.uint64)
+
+    one = np.uint64(1)
+    overflow_limit = np.uint64((int(UINT64_MAX) - 1) // 3)
+    active = current > one
+    rows, current = rows[active], current[active]
+    while len(rows):
+        odd = (current & one) == one
+        blown = odd & (current > overflow_limit)
+        for row, value in zip(rows[blown], current[blown]):
+            lengths[row] += len(collatz_sequence(int(value))) - 1
+        current = np.where(odd, current * np.uint64(3) + one, current >> one)
+        lengths[rows[~blown]] += 1
+
+        # Finished trajectories leave, so each step only touches the ones still running
+        active = (current > one) & ~blown
+        rows, current = rows[active], current[active]
+    return lengths
+
+def number_chunks(start, stop, chunk_size=1 << 20):
+    """Consecutive uint64 chunks of start..stop-1, for streaming ranges that do not fit in memory"""
+    for chunk_start in range(start, stop, chunk_size):
+        yield np.arange(chunk_start, min(stop, chunk_start + chunk_size), dtype=np.uint64)
+
+class DistanceHistogram:
+    """
+    Exact count of numbers per (P, M, L) distance triple, filled chunk by chunk.
+
+    The distances are small integers (at most about the bit length), so the whole
+    range 1..2^32 collapses into a few thousand cells. weights holds the summed
+    sequence lengths per cell when the histogram is filled weighted.
+    """
+    def __init__(self):
+        self.counts = np.zeros((0, 0, 0), dtype=np.int64)
+        self.weights = np.zeros((0, 0, 0), dtype=np.float64)
+        self.total = 0
+
+    def _grow(self, shape):
+        shape = tuple(max(a, b) for a, b in zip(self.counts.shape, shape))
+        if shape != self.counts.shape:
+            padding = [(0, new - old) for new, old in zip(shape, self.counts.shape)]
+            self.counts = np.pad(self.counts, padding)
+            self.weights = np.pad(self.weights, padding)
+
+    def add(self, numbers, weights=None):
+        """Accumulate a chunk of numbers, with an optional weight per number"""
+        p, m, l = binary_distances(numbers)
+        if len(p) == 0:
+            return
+        self._grow((p.max() + 1, m.max() + 1, l.max() + 1))
+        cells = np.ravel_multi_index((p, m, l), self.counts.shape)
+        self.counts += np.bincount(cells, minlength=self.counts.size).reshape(self.counts.shape)
+        if weights is not None:
+            self.weights += np.bincount(cells, weights=np.asarray(weights, dtype=np.float64).ravel(),
+                                        minlength=self.counts.size).reshape(self.counts.shape)
+        self.total += len(p)
+
+    def fill(self, chunks, weighted=False):
+        """Accumulate an iterable of number chunks, weighted by sequence length if asked"""
+        for chunk in chunks:
+            self.add(chunk, collatz_sequence_lengths(chunk) if weighted else None)
+        return self
+
+    def cells(self):
+        """(p, m, l, count, weight) arrays of the non-empty cells"""
+        p, m, l = np.nonzero(self.counts)
+        return p, m, l, self.counts[p, m, l], self.weights[p, m, l]
+
+def _as_chunks(numbers):
+    """A list or array of numbers as one chunk; anything else is taken as an iterable of chunks"""
+    if isinstance(numbers, (list, tuple, range, np.ndarray)):
+        return [numbers]
+    return numbers
+
+def plot_triangle_density(histogram, weighted=False):
+    """
+    Binned version of plot_triangle_space: one image of the number count (or mean
+    sequence length) per normalized (M, L) cell, for any amount of numbers.
+    """
+    counts = histogram.counts.sum(axis=0)
+    m_cells, l_cells = np.nonzero(counts)
+    max_m = max(m_cells.max(), 1)
+    max_l = max(l_cells.max(), 1)
+    counts = counts[:max_m + 1, :max_l + 1]
+
+    if weighted:
+        values = histogram.weights.sum(axis=0)[:max_m + 1, :max_l + 1] / np.maximum(counts, 1)
+        label, norm = 'Mean sequence length', None
+    else:
+        values, label, norm = counts, 'Numbers per cell', LogNorm()
+    values = np.ma.masked_where(counts == 0, values)
+
+    # Cells are centered on the integer distances, normalized by their maximum like the scatter
+    m_edges = (np.arange(max_m + 2) - 0.5) / max_m
+    l_edges = (np.arange(max_l + 2) - 0.5) / max_l
+
+    plt.figure(figsize=(8, 8))
+    plt.pcolormesh(m_edges, l_edges, values.T, cmap='viridis', norm=norm)
+    plt.colorbar(label=label)
+
+    plt.scatter(0, 0, marker='^', s=200, color='red', label='P (Power of Two)')
+    plt.scatter(1, 0, marker='^', s=200, color='green', label='M (Mersenne)')
+    plt.scatter(0, 1, marker='^', s=200, color='blue', label='L (Harbor)')
+
+    plt.xlabel("M-distance (Normalized)")
+    plt.ylabel("L-distance (Normalized)")
+    plt.title(f"Collatz Numbers in Triangle Space ({histogram.total:,} numbers)")
+    plt.legend()
+    plt.grid(True)
+    plt.xlim(-0.1, 1.1)
+    plt.ylim(-0.1, 1.1)
+    plt.show()
+
+def plot_ternary_density(histogram, gridsize=60, weighted=False):
+    """
+    Binned version of plot_ternary_space: the distance triples are accumulated into
+    triangular bins drawn as one mesh, colored by number count or mean sequence length.
+    """
+    p, m, l, counts, weights = histogram.cells()
+
+    # Numbers with all three distances zero (just 1) have no place on the triangle
+    placed = (p + m + l) > 0
+    p, m, l, counts, weights = p[placed], m[placed], l[placed], counts[placed], weights[placed]
+
+    fig = plt.figure(figsize=(16, 16))
+    ax = fig.add_subplot(111, projection='ternary')
+
+    # Every cell stands for many numbers, so bins reduce over cell indices to stay exact
+    cells = np.arange(len(p), dtype=np.float64)
+    if weighted:
+        def reduce(index):
+            index = np.asarray(index, dtype=np.int64)
+            return weights[index].sum() / counts[index].sum()
+        label, norm = 'Mean sequence length', None
+    else:
+        def reduce(index):
+            return counts[np.asarray(index, dtype=np.int64)].sum()
+        label, norm = 'Numbers per bin', LogNorm()
+
+    mesh = ax.tribin(p, m, l, C=cells, gridsize=gridsize, reduce_C_function=reduce, mincnt=1,
+                     cmap='viridis', norm=norm)
+    fig.colorbar(mesh, ax=ax, label=label, shrink=0.6)
+
+    ax.set_tlabel('P-distance')
+    ax.set_llabel('M-distance')
+    ax.set_rlabel('L-distance')
+    ax.set_title(f"Collatz Numbers in Ternary Space ({histogram.total:,} numbers)")
+    plt.show()
+
+def plot_triangle_space(numbers, mode='scatter', weighted=False):
     """
     Plots the numbers in the triangle space based on their P, M, and L distances.
+
+    mode='density' bins the numbers instead of drawing one marker each; numbers can
+    then also be an iterable of chunks (see number_chunks), and weighted colors the
+    bins by mean sequence length.
     """
+    if mode == 'density':
+        return plot_triangle_density(DistanceHistogram().fill(_as_chunks(numbers), weighted), weighted)
+
     p_distances = []
     m_distances = []
     l_distances = []
@@ -174,10 +403,17 @@ def plot_triangle_space(numbers):
     plt.ylim(-0.1, 1.1)
     plt.show()
 
-def plot_ternary_space(numbers):
+def plot_ternary_space(numbers, mode='scatter', gridsize=60, weighted=False):
     """
     Plots the numbers in a ternary plot based on their P, M, and L distances.
+
+    mode='density' bins the numbers into gridsize triangles per side instead of
+    drawing one marker each, as in plot_triangle_space.
     """
+    if mode == 'density':
+        histogram = DistanceHistogram().fill(_as_chunks(numbers), weighted)
+        return plot_ternary_density(histogram, gridsize, weighted)
+
     p_distances = []
     m_distances = []
     l_distances = []
@@ -260,6 +496,11 @@ def analyze_distance_vs_length(num_samples, max_val):
     plt.show()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='P/M/L distances of Collatz numbers')
+    parser.add_argument('--density-bits', type=int, default=16,
+                        help='Density plots cover 1..2^BITS (24 or more takes a while)')
+    args = parser.parse_args()
+
     # Generate and test some examples
     test_set = generate_test_set(100)
     
@@ -283,4 +524,8 @@ if __name__ == "__main__":
     plot_triangle_space(test_numbers)
     plot_ternary_space(test_numbers)
 
+    # Whole ranges only work binned; numbers are streamed in chunks
+    plot_ternary_space(number_chunks(1, 1 << args.density_bits), mode='density')
+    plot_ternary_space(number_chunks(1, 1 << min(args.density_bits, 16)), mode='density', weighted=True)
+
     analyze_distance_vs_length(1000, 10000)
\ No newline at end of file
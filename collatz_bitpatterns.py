@@ -0,0 +1,208 @@
+"""
+Binary-pattern matching on integers and uint64 arrays.
+
+Ints of ordinary size are matched with bin() and substring checks, which is the
+fastest option in Python. For ints of COMPILED_MIN_BITS bits and more, and for uint64
+arrays, a BitPatternMatcher tests the whole set of patterns in one pass of shifts and
+ANDs instead. The patterns are stored in a trie keyed by the first (most significant)
+bit. A node's accumulator has bit p set when the pattern prefix ending at that node
+occurs with its first bit at position p, so patterns with a shared prefix share its
+work, and a branch is abandoned as soon as its accumulator is zero.
+
+PatternScaler applies the sphere renderers' "pattern -> factor" number adjustments
+on top of a matcher, with the same sequential semantics as the original string checks.
+"""
+
+import functools
+import numpy as np
+
+# From about this size the compiled shift/AND matcher beats bin() and substring checks
+COMPILED_MIN_BITS = 1024
+
+
+class BitPatternMatcher:
+    """
+    Match a fixed set of binary patterns (strings of '0'/'1', MSB first).
+    Very large ints use a matcher generated from the patterns when the matcher is built.
+    """
+    def __init__(self, patterns):
+        self.patterns = tuple(patterns)
+        for pattern in self.patterns:
+            if not pattern or set(pattern) - {'0', '1'}:
+                raise ValueError(f"Invalid binary pattern {pattern!r}")
+
+        # Trie nodes are (children, terminal pattern indices); children is keyed by '0'/'1'
+        self._root = ({}, [])
+        for index, pattern in enumerate(self.patterns):
+            node = self._root
+            for bit in pattern:
+                node = node[0].setdefault(bit, ({}, []))
+            node[1].append(index)
+
+        self.max_length = max((len(pattern) for pattern in self.patterns), default=0)
+        self._pattern_bits = tuple((1 << index, pattern) for index, pattern in enumerate(self.patterns))
+        self._match_compiled = self._compile()
+
+    def match(self, n):
+        """Bitmask of the patterns found in bin(n): bit i is set if patterns[i] occurs"""
+        if type(n) is not int:
+            n = int(n)
+        if n < 0:
+            return 0
+        if n.bit_length() >= COMPILED_MIN_BITS:
+            return self._match_compiled(n)
+        binary = bin(n)[2:]
+        found = 0
+        for bit, pattern in self._pattern_bits:
+            if pattern in binary:
+                found |= bit
+        return found
+
+    def _compile(self):
+        """
+        Generate the large-int matcher as straight-line Python: one shift per pattern bit
+        position and one AND per trie node, so the per-call work is a handful of C-level
+        int operations instead of a trie walk or a bin() string.
+        """
+        # Term for the c-th pattern bit: bit p of (n << c) is bit p - c of n
+        terms = {}
+        body = []
+
+        def term(bit, depth):
+            name = f"{'o' if bit == '1' else 'z'}{depth}"
+            if name not in terms:
+                n = 'n' if bit == '1' else '~n'
+                terms[name] = f'{name} = {n} << {depth}' if depth else f'{name} = {n}'
+            return name
+
+        def emit(node, acc, depth, indent):
+            for bit, child in node[0].items():
+                name = f'a_{acc[2:]}{bit}' if acc != 'v' else f'a_{bit}'
+                mask = sum(1 << index for index in child[1])
+                pad = '    ' * indent
+                body.append(f'{pad}{name} = {acc} & {term(bit, depth)}')
+                # Nested ifs skip every pattern below a failed prefix; very long patterns
+                # continue unnested to stay under Python's static nesting limit
+                if indent < 16:
+                    body.append(f'{pad}if {name}:')
+                    if mask:
+                        body.append(f'{pad}    f |= {mask}')
+                    emit(child, name, depth + 1, indent + 1)
+                    if not mask and not child[0]:
+                        body.append(f'{pad}    pass')
+                else:
+                    if mask:
+                        body.append(f'{pad}if {name}: f |= {mask}')
+                    emit(child, name, depth + 1, indent)
+
+        emit(self._root, 'v', 0, 1)
+        # Numpy integers are converted so n.bit_length() and unbounded shifts work. Starting
+        # from the positions inside bin(n) keeps patterns with leading zeros from matching
+        # the zeros above the highest set bit; bin(0) is the single bit '0'
+        source = '\n'.join([
+            'def match(n):',
+            '    """Bitmask of the patterns found in bin(n): bit i is set if patterns[i] occurs"""',
+            '    if type(n) is not int:',
+            '        n = int(n)',
+            '    if n < 0:',
+            '        return 0',
+            '    v = (1 << (n.bit_length() or 1)) - 1',
+            *(f'    {line}' for line in terms.values()),
+            '    f = 0',
+            *body,
+            '    return f',
+        ])
+        namespace = {}
+        exec(source, namespace)
+        return namespace['match']
+
+    def contains(self, n, pattern=None):
+        """True if bin(n) contains any pattern, or the given one"""
+        found = self.match(n)
+        if pattern is None:
+            return found != 0
+        return bool(found >> self.patterns.index(pattern) & 1)
+
+    def match_array(self, values):
+        """
+        Boolean array of shape (len(values), len(patterns)) for a uint64 array.
+        Object arrays of Python ints (beyond 64 bits) are matched element by element.
+        """
+        values = np.asarray(values)
+        if values.dtype == object:
+            masks = [self.match(int(value)) for value in values.ravel()]
+            found = np.array([[mask >> i & 1 for i in range(len(self.patterns))] for mask in masks],
+                             dtype=bool).reshape(values.shape + (len(self.patterns),))
+            return found
+
+        values = values.astype(np.uint64, copy=False)
+        found = np.zeros(values.shape + (len(self.patterns),), dtype=bool)
+        if values.size == 0:
+            return found
+
+        shifts = min(self.max_length, 64)
+        ones = [values << np.uint64(c) for c in range(shifts)]
+        zeros = [~values << np.uint64(c) for c in range(shifts)]
+
+        # Smear the highest set bit down to get every position inside bin(n); bin(0) is '0'
+        valid = values | (values == 0).astype(np.uint64)
+        for shift in (1, 2, 4, 8, 16, 32):
+            valid |= valid >> np.uint64(shift)
+
+        stack = [(self._root, valid, 0)]
+        while stack:
+            node, acc, depth = stack.pop()
+            for index in node[1]:
+                found[..., index] = acc != 0
+            if depth >= shifts:
+                continue  # Longer patterns cannot fit in 64 bits
+            for bit, child in node[0].items():
+                child_acc = acc & (ones[depth] if bit == '1' else zeros[depth])
+                if child_acc.any():
+                    stack.append((child, child_acc, depth + 1))
+        return found
+
+
+@functools.lru_cache(maxsize=None)
+def compile_patterns(patterns):
+    """Cached matcher for a tuple of patterns"""
+    return BitPatternMatcher(patterns)
+
+
+def contains_pattern(n, pattern):
+    """Checks if the binary representation of n contains the given pattern."""
+    if type(n) is not int:
+        n = int(n)
+    if n.bit_length() < COMPILED_MIN_BITS:
+        return pattern in bin(n)[2:]
+    return compile_patterns((pattern,)).match(n) != 0
+
+
+class PatternScaler:
+    """
+    Multiply a number by a factor for every pattern its binary form contains.
+
+    Factors are applied in order, and each later pattern is tested against the
+    already adjusted number. Very large ints go through the matcher, which only
+    rescans after a factor applied.
+    """
+    def __init__(self, factors):
+        self.factors = dict(factors)
+        self.matcher = compile_patterns(tuple(self.factors))
+        self._factor_list = tuple(self.factors.values())
+        self._factor_items = tuple(self.factors.items())
+
+    def apply(self, n):
+        """Adjusted value of a Python int"""
+        if n.bit_length() < COMPILED_MIN_BITS:
+            for pattern, factor in self._factor_items:
+                if pattern in bin(n)[2:]:
+                    n = int(n * factor)
+            return n
+
+        found = self.matcher.match(n)
+        for index, factor in enumerate(self._factor_list):
+            if found >> index & 1:
+                n = int(n * factor)
+                found = self.matcher.match(n)
+        return n
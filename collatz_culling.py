@@ -0,0 +1,129 @@
+"""
+Hidden-point culling for the sphere point clouds, shared by the sphere renderers.
+
+Points are bucketed into tiles of sphere directions (a cube map with tiles_per_face^2
+tiles per face) and reordered so every tile is one contiguous range. Each tile keeps a
+bounding cone of its directions, so for a camera position the tiles whose points all
+face away from the camera can be dropped with one test per tile, and what remains is
+a short list of (first, count) ranges for glMultiDrawArrays or an index mask.
+
+A point p counts as hidden when it lies on the far side of its own sphere as seen from
+the eye E, i.e. dot(p, E) <= |p|^2. Most of the back hemisphere is dropped that way.
+This treats the sphere as opaque: in the renderers' sparse clouds, back-side points
+show through the gaps, so culling changes the image. That is why it is opt-in.
+"""
+
+import math
+import numpy as np
+
+
+def gl_rotation_matrix(angle, axis):
+    """Rotation matrix of glRotatef(angle, *axis); a zero axis is no rotation"""
+    axis = np.asarray(axis, dtype=np.float64)
+    length = np.linalg.norm(axis)
+    if length < 1e-4:
+        return np.eye(3)
+    x, y, z = axis / length
+    c = math.cos(math.radians(angle))
+    s = math.sin(math.radians(angle))
+    return np.array([
+        [x*x*(1-c) + c,   x*y*(1-c) - z*s, x*z*(1-c) + y*s],
+        [y*x*(1-c) + z*s, y*y*(1-c) + c,   y*z*(1-c) - x*s],
+        [x*z*(1-c) - y*s, y*z*(1-c) + x*s, z*z*(1-c) + c]
+    ])
+
+
+def object_space_eye(rotation, translation):
+    """Camera position in object space for a modelview of p -> rotation @ p + translation"""
+    return np.asarray(rotation, dtype=np.float64).T @ -np.asarray(translation, dtype=np.float64)
+
+
+def cube_tile_ids(points, tiles_per_face):
+    """Cube-map tile of every point's direction: face * tiles_per_face^2 + row * tiles_per_face + column"""
+    points = np.asarray(points, dtype=np.float64)
+    magnitude = np.abs(points)
+    major = np.argmax(magnitude, axis=1)
+    rows = np.arange(len(points))
+    face = major * 2 + (points[rows, major] < 0)
+
+    # The two minor coordinates projected onto the face, in [-1, 1]
+    scale = magnitude[rows, major]
+    scale[scale == 0] = 1.0
+    u = points[rows, (major + 1) % 3] / scale
+    v = points[rows, (major + 2) % 3] / scale
+    column = np.clip(((u + 1) * 0.5 * tiles_per_face).astype(np.int64), 0, tiles_per_face - 1)
+    row = np.clip(((v + 1) * 0.5 * tiles_per_face).astype(np.int64), 0, tiles_per_face - 1)
+    return (face * tiles_per_face + row) * tiles_per_face + column
+
+
+class SphereTiles:
+    """
+    Tile index over the directions of a point cloud centered on the origin.
+
+    order is the permutation that makes every tile contiguous (points[order]); within a
+    tile, points are ordered by the optional secondary key, then by original index.
+    starts/counts give each non-empty tile's range in that order.
+    """
+    def __init__(self, points, tiles_per_face=16, secondary_key=None):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        tile_ids = cube_tile_ids(points, tiles_per_face)
+        keys = (tile_ids,) if secondary_key is None else (secondary_key, tile_ids)
+        self.order = np.lexsort(keys)
+        self.point_count = len(points)
+
+        sorted_ids = tile_ids[self.order]
+        self.starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])[:len(points)]
+        self.counts = np.diff(np.r_[self.starts, len(points)])
+
+        # Tile of every point in sorted order, as an index into starts/counts
+        self.tile_of = np.repeat(np.arange(len(self.starts)), self.counts)
+
+        # Bounding cone per tile: mean direction and the widest angle to any member
+        radius = np.linalg.norm(points[self.order], axis=1)
+        directions = points[self.order] / np.where(radius > 0, radius, 1.0)[:, None]
+        if len(points):
+            center = np.add.reduceat(directions, self.starts, axis=0)
+            center /= np.maximum(np.linalg.norm(center, axis=1), 1e-12)[:, None]
+            cos_spread = np.minimum.reduceat(np.einsum('ij,ij->i', directions, center[self.tile_of]), self.starts)
+            self.min_radius = np.minimum.reduceat(radius, self.starts)
+        else:
+            center = np.zeros((0, 3))
+            cos_spread = self.min_radius = np.zeros(0)
+        self.centers = center
+        self.spread = np.arccos(np.clip(cos_spread, -1.0, 1.0))
+
+    @property
+    def tile_count(self):
+        return len(self.starts)
+
+    def visible(self, eye):
+        """Boolean per tile: False when every point of the tile faces away from eye"""
+        eye = np.asarray(eye, dtype=np.float64)
+        distance = np.linalg.norm(eye)
+        if distance == 0:
+            return np.ones(self.tile_count, dtype=bool)
+
+        # Largest dot(direction, eye) inside the cone: the cone edge closest to the eye
+        angle = np.arccos(np.clip(self.centers @ (eye / distance), -1.0, 1.0))
+        closest = distance * np.cos(np.maximum(0.0, angle - self.spread))
+
+        # From inside a tile's radius the camera sees every point
+        return (closest > self.min_radius) | (distance <= self.min_radius)
+
+    def visible_ranges(self, eye):
+        """(firsts, counts) int32 arrays of the visible points in tile order, adjacent tiles merged"""
+        visible = self.visible(eye)
+        if not visible.any():
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32)
+
+        # Runs of consecutive visible tiles are one range, since tiles are contiguous
+        edges = np.diff(np.r_[0, visible.astype(np.int8), 0])
+        run_begin = np.flatnonzero(edges == 1)
+        run_end = np.flatnonzero(edges == -1)
+        ends = np.r_[self.starts, self.point_count]
+        return (self.starts[run_begin].astype(np.int32),
+                (ends[run_end] - self.starts[run_begin]).astype(np.int32))
+
+    def visible_mask(self, eye):
+        """Boolean per point in tile order"""
+        return np.repeat(self.visible(eye), self.counts)
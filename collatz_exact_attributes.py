@@ -0,0 +1,148 @@
+"""
+Exact CPU evaluation of the Collatz attributes shown by the GPU sphere viewer.
+
+The viewer's shader works in 32-bit ints, so it caps numbers at 10^9 and gives up
+when 3n+1 would overflow. This module evaluates the same position -> number ->
+(steps, max value, convergence speed, converged) mapping without those caps.
+Trajectories run vectorized in NumPy uint64, and any trajectory that would leave
+the uint64 range is finished with Python ints. The result is laid out exactly like
+the viewer's attribute buffer: one float32 vec4 per point.
+"""
+
+import numpy as np
+
+PHI_FRACTION = 0x9E3779B9  # fract(PHI) * 2^32, as in the shader
+UINT64_MAX = np.iinfo(np.uint64).max
+FLOAT32_MAX = float(np.finfo(np.float32).max)
+
+# The shader stops every trajectory after this many iterations, whatever max_iterations is
+LOOP_GUARD = 500
+
+
+def sphere_points(point_count, start, stop):
+    """Normalized Fibonacci-lattice points start..stop-1 as a (3, stop - start) float64 array"""
+    idx = np.arange(start, stop, dtype=np.uint64)
+
+    # Same lattice as generate_sphere_point in the shader, including its
+    # 32-bit fixed-point golden ratio step
+    fraction = (idx * np.uint64(PHI_FRACTION)) & np.uint64(0xFFFFFFFF)
+    theta = 2.0 * np.pi * (fraction / 4294967296.0)
+    phi = np.arccos(np.clip(1.0 - 2.0 * (idx + 0.5) / point_count, -1.0, 1.0))
+    sin_phi = np.sin(phi)
+    p = np.stack((np.cos(theta) * sin_phi, np.sin(theta) * sin_phi, np.cos(phi)))
+    p /= np.sqrt((p * p).sum(axis=0))
+    return p
+
+
+def sphere_radii(point_count, start, stop, chunk_size=1_000_000):
+    """Radius of each normalized Fibonacci-lattice point start..stop-1, in float64"""
+    radii = np.empty(max(0, stop - start), dtype=np.float64)
+    for chunk_start in range(start, stop, chunk_size):
+        chunk_stop = min(stop, chunk_start + chunk_size)
+        p = sphere_points(point_count, chunk_start, chunk_stop)
+        radii[chunk_start - start:chunk_stop - start] = np.sqrt((p * p).sum(axis=0))
+    return radii
+
+
+def radius_to_number(r, scale_exponent):
+    """Exact version of position_to_number: 2^(r * scale) with the shader's pattern adjustments"""
+    n = int(2.0 ** (r * scale_exponent))
+    if n & 0x5 == 0x5:
+        n = n * 11 // 10
+    if n & 0x7 == 0x7:
+        n = n * 9 // 10
+    return max(1, n)
+
+
+def collatz_attributes_bigint(n, max_iterations):
+    """(steps, max value, convergence speed, converged) of one Python int"""
+    current = n
+    max_value = n
+    first_decrease_step = -1
+
+    for i in range(min(max_iterations, LOOP_GUARD)):
+        if current & (current - 1) == 0:
+            speed = first_decrease_step / i if first_decrease_step > 0 else 0.0
+            return (float(i), max_value, speed, 1.0)
+
+        current = current // 2 if current % 2 == 0 else 3 * current + 1
+        max_value = max(max_value, current)
+        if first_decrease_step < 0 and current < n:
+            first_decrease_step = i
+
+    return (0.0, max_value, 0.0, 0.0)
+
+
+def collatz_attributes(numbers, max_iterations):
+    """
+    Attributes for a sequence of Python ints as a (len(numbers), 4) float64 array.
+    Numbers are stepped together in uint64; rows that start above uint64 or whose
+    next 3n+1 would overflow it are finished one by one as Python ints.
+    """
+    numbers = list(numbers)
+    result = np.zeros((len(numbers), 4), dtype=np.float64)
+    max_values = [0] * len(numbers)
+
+    fits = np.array([n <= UINT64_MAX for n in numbers], dtype=bool)
+    rows = np.flatnonzero(fits)
+    start = np.array([numbers[row] for row in rows], dtype=np.uint64)
+
+    current = start.copy()
+    max_value = start.copy()
+    first_decrease = np.full(len(rows), -1, dtype=np.int64)
+    active = np.ones(len(rows), dtype=bool)
+    overflow = np.zeros(len(rows), dtype=bool)
+    one = np.uint64(1)
+    overflow_limit = np.uint64((int(UINT64_MAX) - 1) // 3)
+
+    for i in range(min(max_iterations, LOOP_GUARD)):
+        if not active.any():
+            break
+
+        # Converged rows leave the active set with their step count
+        power_of_two = active & ((current & (current - one)) == 0)
+        if power_of_two.any():
+            result[rows[power_of_two], 0] = i
+            result[rows[power_of_two], 3] = 1.0
+            decreased = power_of_two & (first_decrease > 0)
+            if i > 0:
+                result[rows[decreased], 2] = first_decrease[decreased] / i
+            active &= ~power_of_two
+
+        odd = active & ((current & one) == one)
+        blown = odd & (current > overflow_limit)
+        if blown.any():
+            overflow |= blown
+            active &= ~blown
+            odd &= ~blown
+
+        even = active & ~odd
+        current[even] >>= one
+        current[odd] = current[odd] * np.uint64(3) + one
+
+        np.maximum(max_value, np.where(active, current, max_value), out=max_value)
+        newly_decreased = active & (first_decrease < 0) & (current < start)
+        first_decrease[newly_decreased] = i
+
+    for row, value in zip(rows[~overflow], max_value[~overflow]):
+        max_values[row] = int(value)
+
+    # Big-int fallback for everything uint64 could not hold
+    for row in list(np.flatnonzero(~fits)) + list(rows[overflow]):
+        steps, max_values[row], speed, converged = collatz_attributes_bigint(numbers[row], max_iterations)
+        result[row] = (steps, 0.0, speed, converged)
+
+    result[:, 1] = [min(float(v), FLOAT32_MAX) if v.bit_length() <= 128 else FLOAT32_MAX for v in max_values]
+    return result
+
+
+def compute_sphere_attributes(point_count, start, stop, scale_exponent, max_iterations):
+    """
+    Float32 (stop - start, 4) attribute block for sphere points start..stop-1.
+    The number only depends on the radius, which takes very few distinct values,
+    so trajectories are evaluated once per distinct radius.
+    """
+    radii, inverse = np.unique(sphere_radii(point_count, start, stop), return_inverse=True)
+    numbers = [radius_to_number(r, scale_exponent) for r in radii]
+    attributes = collatz_attributes(numbers, max_iterations).astype(np.float32)
+    return attributes[inverse.ravel()]
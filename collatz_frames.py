@@ -0,0 +1,226 @@
+"""
+Frame encoding, asynchronous frame writing and resumable render manifests
+shared by the sphere renderers. Frames are uint8 RGB arrays; encoding runs on background threads so rendering
+and disk I/O overlap (zlib releases the GIL while compressing).
+"""
+
+import json
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+import numpy as np
+
+FRAME_FORMATS = ('png', 'bmp', 'raw')
+
+
+def encode_png(image, level=6):
+    """Encode a top-down (height, width, 3) uint8 RGB image as PNG bytes"""
+    height, width = image.shape[:2]
+
+    # Every scanline is prefixed with filter type 0 (None)
+    scanlines = np.empty((height, width * 3 + 1), dtype=np.uint8)
+    scanlines[:, 0] = 0
+    scanlines[:, 1:] = image.reshape(height, width * 3)
+
+    def chunk(tag, data):
+        return (struct.pack('>I', len(data)) + tag + data +
+                struct.pack('>I', zlib.crc32(tag + data) & 0xFFFFFFFF))
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' +
+            chunk(b'IHDR', header) +
+            chunk(b'IDAT', zlib.compress(scanlines, level)) +
+            chunk(b'IEND', b''))
+
+
+def encode_bmp(image):
+    """Encode a top-down (height, width, 3) uint8 RGB image as a 24-bit BMP"""
+    height, width = image.shape[:2]
+    row_bytes = (width * 3 + 3) & ~3
+
+    # BMP rows are stored bottom-up in BGR order, padded to 4 bytes
+    rows = np.zeros((height, row_bytes), dtype=np.uint8)
+    rows[:, :width * 3] = image[::-1, :, ::-1].reshape(height, width * 3)
+
+    pixel_bytes = rows.nbytes
+    header = struct.pack('<2sIHHI', b'BM', 54 + pixel_bytes, 0, 0, 54)
+    info = struct.pack('<IiiHHIIiiII', 40, width, height, 1, 24, 0, pixel_bytes, 2835, 2835, 0, 0)
+    return header + info + rows.tobytes()
+
+
+def frame_output_path(output_dir, frame, fmt='png', chunk_frames=60):
+    """Path a frame is written to (raw frames share one chunk file per chunk_frames frames)"""
+    if fmt == 'raw':
+        return os.path.join(output_dir, f'frames_{frame // chunk_frames:05d}.rgb')
+    return os.path.join(output_dir, f'frame_{frame:08d}.{fmt}')
+
+
+class AsyncFrameWriter:
+    """
+    Writes frames on background threads fed through a bounded queue.
+
+    Callers take a preallocated buffer with acquire_buffer(), fill it (e.g. with
+    glReadPixels) and hand it back with submit(); the buffer itself is queued, so
+    no copy is made. The number of buffers bounds memory: when they are all in
+    flight acquire_buffer() blocks (or returns None when block=False).
+    """
+    def __init__(self, output_dir, width, height, fmt='png', threads=2, queue_size=4,
+                 chunk_frames=60, png_level=6, on_written=None, on_failed=None):
+        if fmt not in FRAME_FORMATS:
+            raise ValueError(f"Unknown frame format {fmt!r}, expected one of {FRAME_FORMATS}")
+
+        self.output_dir = output_dir
+        self.width = width
+        self.height = height
+        self.fmt = fmt
+        self.chunk_frames = chunk_frames
+        self.png_level = png_level
+        self.on_written = on_written
+        self.on_failed = on_failed
+        self.frame_bytes = width * height * 3
+
+        os.makedirs(output_dir, exist_ok=True)
+
+        self._pending = queue.Queue(maxsize=queue_size)
+        self._free = queue.Queue()
+        for _ in range(queue_size + threads):
+            self._free.put(np.empty((height, width, 3), dtype=np.uint8))
+
+        self._threads = [
+            threading.Thread(target=self._write_loop, name=f'frame-writer-{i}', daemon=True)
+            for i in range(threads)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def acquire_buffer(self, block=True):
+        """Get a free frame buffer, None if block is False and none is free"""
+        try:
+            return self._free.get(block=block)
+        except queue.Empty:
+            return None
+
+    def release_buffer(self, buffer):
+        """Return a buffer that will not be submitted"""
+        self._free.put(buffer)
+
+    def submit(self, frame, buffer, bottom_up=True):
+        """Queue a filled buffer for writing. bottom_up buffers (OpenGL readback) are flipped"""
+        self._pending.put((frame, buffer, bottom_up))
+
+    def close(self):
+        """Write everything still queued and stop the writer threads"""
+        for _ in self._threads:
+            self._pending.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _write_loop(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+
+            frame, buffer, bottom_up = item
+            start = time.perf_counter()
+            try:
+                # Flip as a view, the encoders copy rows exactly once
+                image = buffer[::-1] if bottom_up else buffer
+                path = self._write_frame(frame, image)
+                if self.on_written:
+                    self.on_written(frame, path, time.perf_counter() - start)
+            except Exception as e:
+                if self.on_failed:
+                    self.on_failed(frame, e)
+            finally:
+                self._free.put(buffer)
+
+    def _write_frame(self, frame, image):
+        path = frame_output_path(self.output_dir, frame, self.fmt, self.chunk_frames)
+
+        if self.fmt == 'raw':
+            # Raw chunks hold chunk_frames consecutive rgb24 frames at fixed offsets,
+            # so frames can arrive in any order and from several processes
+            offset = (frame % self.chunk_frames) * self.frame_bytes
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT, 0o644)
+            try:
+                os.pwrite(fd, np.ascontiguousarray(image).data, offset)
+            finally:
+                os.close(fd)
+            return path
+
+        data = encode_png(image, self.png_level) if self.fmt == 'png' else encode_bmp(image)
+
+        # Write to a temporary name first so a crash never leaves a truncated frame
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return path
+
+
+class FrameManifest:
+    """
+    Append-only journal (manifest.jsonl) of frames that finished writing.
+
+    Each line records the frame, its file, the frame parameters and the hashes of
+    the point data and render parameters it was rendered with. Lines are appended
+    with a single write so several worker processes can share the journal, and a
+    crash loses at most the frames that were still in flight.
+    """
+    FILENAME = 'manifest.jsonl'
+
+    def __init__(self, output_dir, points_hash, params_hash):
+        self.output_dir = output_dir
+        self.points_hash = points_hash
+        self.params_hash = params_hash
+        self.path = os.path.join(output_dir, self.FILENAME)
+
+    def record(self, frame, path, **frame_params):
+        """Record a frame whose file has been completely written"""
+        entry = {
+            'frame': frame,
+            'file': os.path.basename(path),
+            'points_hash': self.points_hash,
+            'params_hash': self.params_hash,
+            'time': time.time(),
+            **frame_params
+        }
+        line = (json.dumps(entry) + '\n').encode()
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+    def completed_frames(self):
+        """Frames rendered with the current hashes whose files still exist"""
+        entries = {}
+        try:
+            with open(self.path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Partial line from an interrupted run
+                    entries[entry['frame']] = entry
+        except FileNotFoundError:
+            return {}
+
+        return {
+            frame: entry for frame, entry in entries.items()
+            if entry.get('points_hash') == self.points_hash
+            and entry.get('params_hash') == self.params_hash
+            and os.path.exists(os.path.join(self.output_dir, entry['file']))
+        }
+
+    def clear(self):
+        """Forget every recorded frame"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,67 @@
+"""
+Dependency-aware caching for the sphere visualizers driven by collatz_sphere_config.json.
+
+Config fields are grouped by the pipeline stage they invalidate:
+  POINT_FIELDS  - sphere points and their Collatz attributes (the expensive part)
+  COLOR_FIELDS  - per-point colors, recomputed from cached attributes
+  anything else - view settings (camera, auto_rotate, ...), only needs a re-render
+Attributes are cached on disk keyed by the POINT_FIELDS alone, so editing colors or
+the camera never recomputes Collatz numbers.
+"""
+
+import hashlib
+import json
+import os
+import numpy as np
+
+POINT_FIELDS = ('resolution', 'scale', 'max_iterations')
+COLOR_FIELDS = ('color',)
+
+
+def fields_key(values):
+    """Short stable hash of a dict of config values"""
+    return hashlib.sha256(json.dumps(values, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def changed_stages(old_config, new_config):
+    """Stages invalidated by a config edit, a subset of {'points', 'colors', 'view'}"""
+    def changed(fields):
+        return any(old_config.get(field) != new_config.get(field) for field in fields)
+
+    stages = set()
+    if changed(POINT_FIELDS):
+        stages |= {'points', 'colors'}
+    if changed(COLOR_FIELDS):
+        stages.add('colors')
+    other_fields = (set(old_config) | set(new_config)) - set(POINT_FIELDS) - set(COLOR_FIELDS)
+    if changed(other_fields):
+        stages.add('view')
+    return stages
+
+
+class AttributeCache:
+    """On-disk .npz cache of per-point arrays, keyed by the values of the POINT_FIELDS"""
+    def __init__(self, cache_dir, namespace):
+        self.cache_dir = cache_dir
+        self.namespace = namespace
+
+    def path(self, point_values):
+        return os.path.join(self.cache_dir, f'{self.namespace}_{fields_key(point_values)}.npz')
+
+    def load(self, point_values):
+        """Cached arrays as a dict, or None on a miss"""
+        try:
+            with np.load(self.path(point_values)) as cached:
+                return {name: cached[name] for name in cached.files}
+        except (OSError, ValueError):
+            return None
+
+    def save(self, point_values, **arrays):
+        path = self.path(point_values)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # np.savez appends .npz to names without it, keep the suffix on the temporary file
+        tmp_path = f'{path}.tmp.npz'
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+        return path
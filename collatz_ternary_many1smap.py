@@ -60,6 +60,40 @@ def track_single_path(n, max_steps=1000):
     
     return np.array(path)
 
+def track_paths(numbers, max_steps=1000):
+    """
+    Paths of many numbers stacked into one (points, 3) array, with the length of each
+    path, so they can be converted and drawn in one go.
+    """
+    paths = [track_single_path(n, max_steps) for n in numbers]
+    lengths = np.array([len(path) for path in paths], dtype=np.int64)
+    if not paths:
+        return np.zeros((0, 3)), lengths
+    return np.concatenate(paths), lengths
+
+def path_segments(points, lengths):
+    """
+    Line segments of many stacked paths for a single LineCollection.
+
+    points is (total points, 2), path after path. Returns the (segments, 2, 2) array,
+    the position of each segment along its path in [0, 1], the path index of each
+    segment, and the index of the first and last point of every path.
+    """
+    first = np.cumsum(lengths) - lengths
+    last = first + lengths - 1
+
+    # Every point joins the next one, except across the end of a path
+    joined = np.ones(len(points), dtype=bool)
+    joined[last[lengths > 0]] = False
+    starts = np.flatnonzero(joined)
+    segments = np.stack([points[starts], points[starts + 1]], axis=1)
+
+    # Same gradient as np.linspace(0, 1, segment count) per path
+    segment_counts = np.maximum(lengths - 1, 0)
+    path_index = np.repeat(np.arange(len(lengths)), segment_counts)
+    progress = (starts - first[path_index]) / np.maximum(segment_counts[path_index] - 1, 1)
+    return segments, progress, path_index, first, last
+
 def generate_test_set():
     """Generate a diverse set of starting numbers with extended M and L type sequences."""
     test_cases = []
@@ -94,22 +128,18 @@ def visualize_paths(numbers, ax=None):
     if ax is None:
         fig, ax = plt.subplots(figsize=(10, 10))
     
-    # Plot each path with gradient coloring
-    for n in numbers:
-        path = track_single_path(n)
-        
-        # Create segments for line collection
-        points = path[:, [1, 2]]  # Using M and L coordinates
-        segments = np.concatenate([points[:-1, None], points[1:, None]], axis=1)
-        
-        # Create line collection with gradient colors
-        lc = LineCollection(segments, cmap='viridis', alpha=0.6)
-        lc.set_array(np.linspace(0, 1, len(path)-1))
-        ax.add_collection(lc)
-        
-        # Mark start and end points
-        ax.scatter(points[0, 0], points[0, 1], c='red', s=100, label='Start' if n == numbers[0] else "")
-        ax.scatter(points[-1, 0], points[-1, 1], c='green', s=100, label='End' if n == numbers[0] else "")
+    # All paths with gradient coloring in one line collection
+    path, lengths = track_paths(numbers)
+    points = path[:, [1, 2]]  # Using M and L coordinates
+    segments, progress, _, first, last = path_segments(points, lengths)
+    
+    lc = LineCollection(segments, cmap='viridis', alpha=0.6)
+    lc.set_array(progress)
+    ax.add_collection(lc)
+    
+    # Mark start and end points
+    ax.scatter(points[first, 0], points[first, 1], c='red', s=100, label='Start')
+    ax.scatter(points[last, 0], points[last, 1], c='green', s=100, label='End')
         
     # Add labels and formatting
     ax.set_xlabel('M-distance (normalized)')
@@ -133,33 +163,20 @@ def plot_ternary_paths(numbers, max_paths=5):
     # Setup ternary plot
     ax1.plot([0, 1, 0.5, 0], [0, 0, np.sqrt(3)/2, 0], 'k-', alpha=0.5)
     
-    # Plot paths
-    colors = plt.cm.viridis(np.linspace(0, 1, len(numbers)))
-    path_lengths = []
+    # Convert every path to ternary coordinates at once
+    path, lengths = track_paths(numbers[:max_paths])
+    path_lengths = list(lengths)
+    points = np.column_stack(to_ternary_coords(path[:, 0], path[:, 1], path[:, 2]))
     
-    for idx, n in enumerate(numbers[:max_paths]):
-        path = track_single_path(n)
-        path_lengths.append(len(path))
-        
-        # Convert to ternary coordinates
-        x_coords = []
-        y_coords = []
-        for p, m, l in path:
-            x, y = to_ternary_coords(p, m, l)
-            x_coords.append(x)
-            y_coords.append(y)
-        
-        # Plot path with gradient coloring
-        points = np.column_stack([x_coords, y_coords])
-        segments = np.column_stack([points[:-1], points[1:]])
-        
-        lc = LineCollection(segments.reshape(-1, 2, 2), cmap='viridis', alpha=0.6)
-        lc.set_array(np.linspace(0, 1, len(path)-1))
-        ax1.add_collection(lc)
-        
-        # Plot start and end points
-        ax1.scatter(x_coords[0], y_coords[0], c='red', s=50)
-        ax1.scatter(x_coords[-1], y_coords[-1], c='green', s=50)
+    # Plot all paths with gradient coloring as one collection
+    segments, progress, _, first, last = path_segments(points, lengths)
+    lc = LineCollection(segments, cmap='viridis', alpha=0.6)
+    lc.set_array(progress)
+    ax1.add_collection(lc)
+    
+    # Plot start and end points
+    ax1.scatter(points[first, 0], points[first, 1], c='red', s=50)
+    ax1.scatter(points[last, 0], points[last, 1], c='green', s=50)
     
     # Add vertex labels
     ax1.annotate('P', xy=(0, 0), xytext=(-0.05, -0.05))
@@ -218,41 +235,31 @@ def analyze_mersenne_transitions(start_k=3, end_k=32, focus_region=True):
     
     # Generate and track paths for each Mersenne number
     colors = plt.cm.viridis(np.linspace(0, 1, end_k - start_k))
+    k_values = range(start_k, end_k)
+    path, lengths = track_paths([2**k - 1 for k in k_values])
     
-    for idx, k in enumerate(range(start_k, end_k)):
-        # Generate Mersenne number
-        n = (2**k - 1)
-        path = track_single_path(n)
-        
-        # Convert path to ternary coordinates
-        points = []
-        binary_patterns = []
-        
-        for p, m, l in path:
-            x, y = to_ternary_coords(p, m, l)
-            points.append((x, y))
-            binary_patterns.append(bin(n)[2:])
-        
-        points = np.array(points)
-        
-        # Plot path with annotations
-        if len(points) > 1:
-            segments = np.column_stack([points[:-1], points[1:]])
-            lc = LineCollection(segments.reshape(-1, 2, 2), 
-                              color=colors[idx], alpha=0.6)
-            ax1.add_collection(lc)
-        
-        # Mark start point and add k value label
-        if len(points) > 0:
-            ax1.scatter(points[0, 0], points[0, 1], c='red', s=50)
-            ax1.annotate(f'k={k}', (points[0, 0], points[0, 1]), 
-                        xytext=(5, 5), textcoords='offset points')
+    # Convert all paths to ternary coordinates at once
+    points = np.column_stack(to_ternary_coords(path[:, 0], path[:, 1], path[:, 2]))
+    segments, _, path_index, first, _ = path_segments(points, lengths)
+    
+    # Plot every path in its own color as one collection
+    lc = LineCollection(segments, colors=colors[path_index], alpha=0.6)
+    ax1.add_collection(lc)
+    
+    # Mark start points
+    ax1.scatter(points[first, 0], points[first, 1], c='red', s=50)
+    
+    for idx, k in enumerate(k_values):
+        # Add k value label
+        start = points[first[idx]]
+        ax1.annotate(f'k={k}', (start[0], start[1]), 
+                    xytext=(5, 5), textcoords='offset points')
         
         # Store transition data
         pattern_transitions.append({
             'k': k,
-            'patterns': binary_patterns,
-            'positions': points
+            'patterns': [bin(2**k - 1)[2:]] * lengths[idx],
+            'positions': points[first[idx]:first[idx] + lengths[idx]]
         })
     
     # Draw ternary triangle
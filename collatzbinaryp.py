@@ -1,4 +1,6 @@
 import matplotlib.pyplot as plt
+import numpy as np
+from collatz_bitpatterns import contains_pattern
 
 def binary_collatz_sequence(n):
     """
@@ -22,32 +24,59 @@ def binary_collatz_sequence(n):
 
 def contains_101_pattern(n):
     """Checks if the binary representation of n contains the '101' pattern."""
-    binary_string = bin(n)[2:]
-    return "101" in binary_string
+    return contains_pattern(n, "101")
+
+def _sequence_values(sequence):
+    """Integer values of a binary-string sequence, parsed once, and the step of each"""
+    values = [int(binary_string, 2) for binary_string in sequence]
+    return np.arange(len(values)), values
 
-def plot_binary_sequence(sequence):
+def _label_steps(values, max_labels):
+    """
+    Steps whose binary string is drawn as a label. Short sequences label every step;
+    longer ones every k-th step so at most about max_labels are drawn, plus the start,
+    the maximum and the end.
+    """
+    count = len(values)
+    if max_labels is None or count <= max_labels:
+        return range(count)
+    stride = -(-count // max(1, max_labels))
+    peak = max(range(count), key=values.__getitem__)
+    return sorted(set(range(0, count, stride)) | {0, peak, count - 1})
+
+def _draw_binary_sequence(ax, sequence, max_labels):
+    """
+    Draw a sequence onto ax: one marker artist per category (start, after 3n+1, after n/2),
+    decimated binary labels and a thin connecting line.
+    """
+    steps, values = _sequence_values(sequence)
+    y = np.array(values, dtype=float)
+
+    # A step is red when the value before it was odd, i.e. it came from 3n+1
+    after_odd = np.zeros(len(values), dtype=bool)
+    after_odd[1:] = [value & 1 == 1 for value in values[:-1]]
+    after_even = ~after_odd
+    after_even[0] = False
+
+    ax.plot(steps[after_odd], y[after_odd], 'ro', linestyle='none')  # Red dots for 3n+1
+    ax.plot(steps[after_even], y[after_even], 'bo', linestyle='none')  # Blue dots for n/2
+    ax.plot(steps[:1], y[:1], 'go', linestyle='none')  # Green dot for the start
+
+    for i in _label_steps(values, max_labels):
+        ax.text(i, y[i], sequence[i], ha='center', va='bottom')
+
+    ax.plot(steps, y, 'k-', linewidth=0.5)  # Thin line connecting points
+
+def plot_binary_sequence(sequence, max_labels=60):
     """
     Plots the binary sequence, highlighting changes caused by 3n+1.
 
     Args:
         sequence: A list of binary strings representing the Collatz sequence.
+        max_labels: Roughly how many binary labels to draw (None labels every step).
     """
-    y_values = list(range(len(sequence)))
-
     plt.figure(figsize=(15, 5))
-    for i, binary_string in enumerate(sequence):
-        if i > 0:
-            # Check if the previous step was 3n+1
-            if int(sequence[i-1], 2) % 2 != 0:
-                plt.plot(i, int(binary_string, 2), 'ro')  # Red dot for 3n+1
-            else:
-                plt.plot(i, int(binary_string, 2), 'bo')  # Blue dot for n/2
-        else:
-            plt.plot(i, int(binary_string, 2), 'go')  # Green dot for the start
-
-        plt.text(i, int(binary_string, 2), binary_string, ha='center', va='bottom')
-
-    plt.plot(y_values, [int(s, 2) for s in sequence], 'k-', linewidth=0.5)  # Thin line connecting points
+    _draw_binary_sequence(plt.gca(), sequence, max_labels)
 
     plt.xlabel("Step")
     plt.ylabel("Value (Decimal)")
@@ -63,28 +92,13 @@ start_numbers = [27, 341, 15, 21, 7, 19, 3245, 34]  # Add more start numbers as
 
 plt.figure(figsize=(15, 5))
 
-import numpy as np
-
 
-def plot_binary_sequence_log(sequence, start_number):
+def plot_binary_sequence_log(sequence, start_number, max_labels=60):
     """
     Plots the binary sequence on a logarithmic scale.
     """
-    y_values = list(range(len(sequence)))
-
     plt.figure(figsize=(10, 5))
-    
-    for i, binary_string in enumerate(sequence):
-        if i > 0:
-            if int(sequence[i-1], 2) % 2 != 0:
-                plt.plot(i, int(binary_string, 2), 'ro')  # Red dot for 3n+1
-            else:
-                plt.plot(i, int(binary_string, 2), 'bo')  # Blue dot for n/2
-        else:
-            plt.plot(i, int(binary_string, 2), 'go')  # Green dot for the start
-        plt.text(i, int(binary_string, 2), binary_string, ha='center', va='bottom')
-
-    plt.plot(y_values, [int(s, 2) for s in sequence], 'k-', linewidth=0.5)
+    _draw_binary_sequence(plt.gca(), sequence, max_labels)
 
     plt.xlabel("Step")
     plt.ylabel("Value (Decimal, Log Scale)")
@@ -93,27 +107,12 @@ def plot_binary_sequence_log(sequence, start_number):
     plt.grid(True)
     plt.show()
     
-def plot_binary_sequence_individual(sequence, start_number):
+def plot_binary_sequence_individual(sequence, start_number, max_labels=60):
     """
     Plots the binary sequence individually
     """
-    y_values = list(range(len(sequence)))
-
     plt.figure(figsize=(10, 5))
-
-    for i, binary_string in enumerate(sequence):
-        if i > 0:
-            # Check if the previous step was 3n+1
-            if int(sequence[i-1], 2) % 2 != 0:
-                plt.plot(i, int(binary_string, 2), 'ro')  # Red dot for 3n+1
-            else:
-                plt.plot(i, int(binary_string, 2), 'bo')  # Blue dot for n/2
-        else:
-            plt.plot(i, int(binary_string, 2), 'go')  # Green dot for the start
-
-        plt.text(i, int(binary_string, 2), binary_string, ha='center', va='bottom')
-    
-    plt.plot(y_values, [int(s, 2) for s in sequence], 'k-', linewidth=0.5)
+    _draw_binary_sequence(plt.gca(), sequence, max_labels)
 
     plt.xlabel("Step")
     plt.ylabel("Value (Decimal)")
@@ -121,31 +120,17 @@ def plot_binary_sequence_individual(sequence, start_number):
     plt.grid(True)
     plt.show()
 
-def plot_multiple_binary_sequences(start_numbers):
+def plot_multiple_binary_sequences(start_numbers, max_labels=60):
     """
     Plots multiple binary sequences in individual subplots.
     """
     num_plots = len(start_numbers)
-    fig, axes = plt.subplots(num_plots, 1, figsize=(10, 5 * num_plots), sharex=True)
+    fig, axes = plt.subplots(num_plots, 1, figsize=(10, 5 * num_plots), sharex=True, squeeze=False)
 
     for i, start_number in enumerate(start_numbers):
         sequence = binary_collatz_sequence(start_number)
-        y_values = list(range(len(sequence)))
-
-        ax = axes[i]
-
-        for j, binary_string in enumerate(sequence):
-            if j > 0:
-                if int(sequence[j-1], 2) % 2 != 0:
-                    ax.plot(j, int(binary_string, 2), 'ro')
-                else:
-                    ax.plot(j, int(binary_string, 2), 'bo')
-            else:
-                ax.plot(j, int(binary_string, 2), 'go')
-
-            ax.text(j, int(binary_string, 2), binary_string, ha='center', va='bottom')
-
-        ax.plot(y_values, [int(s, 2) for s in sequence], 'k-', linewidth=0.5)
+        ax = axes[i, 0]
+        _draw_binary_sequence(ax, sequence, max_labels)
 
         ax.set_ylabel(f"{start_number}\nValue (Decimal)")
         ax.set_title(f"Collatz Sequence in Binary for {start_number}")
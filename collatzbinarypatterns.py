@@ -1,4 +1,5 @@
 import matplotlib.pyplot as plt
+from collatz_bitpatterns import contains_pattern
 import numpy as np
 
 def generate_repeating_number(pattern, repetitions):
@@ -79,11 +80,6 @@ ax2.legend()
 plt.tight_layout()
 plt.show()
 
-def contains_pattern(n, pattern):
-    """Checks if the binary representation of n contains the given pattern."""
-    binary_string = bin(n)[2:]
-    return pattern in binary_string
-
 def is_in_set(n, target_set):
     """Checks if a number belongs to a given set."""
     return n in target_set
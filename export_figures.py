@@ -0,0 +1,231 @@
+"""
+Headless batch export of the figures of the analysis scripts.
+
+Every script runs in its own worker process with the Agg backend. plt.show() saves the
+open figures to the output directory instead of blocking, and figures still open
+when a script ends are saved too. Scripts run in parallel, each worker handles one
+script, and the console output of each script goes to <script>.log next to its
+figures. A report.json in the output directory lists the figures, the status and the
+run time of every script, so a full report can be generated unattended on a server.
+
+Usage:
+    python export_figures.py                      # every script that uses matplotlib
+    python export_figures.py collatzp2.py -f png svg -o report_figures
+"""
+
+import argparse
+import contextlib
+import glob
+import json
+import multiprocessing
+import multiprocessing.connection
+import os
+import runpy
+import signal
+import sys
+import time
+import traceback
+
+FIGURE_FORMATS = ('png', 'svg', 'pdf')
+
+# Seconds past --timeout before a worker that ignores the alarm is killed
+KILL_GRACE = 30
+
+
+def discover_scripts(directory):
+    """Scripts in directory that use matplotlib, except this one"""
+    scripts = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.py'))):
+        if os.path.abspath(path) == os.path.abspath(__file__):
+            continue
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            if 'matplotlib' in f.read():
+                scripts.append(path)
+    return scripts
+
+
+class ScriptTimeout(Exception):
+    pass
+
+
+def _raise_timeout(signum, frame):
+    raise ScriptTimeout()
+
+
+def export_script(task):
+    """
+    Run one script with the Agg backend and save its figures. Runs in a fresh worker
+    process, so scripts never share pyplot state.
+    """
+    script, output_dir, formats, dpi, timeout = task
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+    import matplotlib.pyplot as plt
+
+    name = os.path.splitext(os.path.basename(script))[0]
+    figures = []
+
+    def save_open_figures(*args, **kwargs):
+        """Replacement for plt.show(): write every open figure that has axes, then close them"""
+        for number in plt.get_fignums():
+            figure = plt.figure(number)
+            if not figure.axes:
+                continue  # Blank figures created but never drawn on
+            stem = os.path.join(output_dir, f'{name}_{len(figures) + 1:02d}')
+            for fmt in formats:
+                figure.savefig(f'{stem}.{fmt}', dpi=dpi, bbox_inches='tight')
+            figures.append(os.path.basename(stem))
+        plt.close('all')
+
+    plt.show = save_open_figures
+
+    # Scripts read and import files next to them, as when started from their directory
+    script_dir = os.path.dirname(os.path.abspath(script))
+    os.chdir(script_dir)
+    sys.path.insert(0, script_dir)
+    sys.argv = [script]
+
+    status, error = 'ok', None
+    start = time.perf_counter()
+    if timeout and hasattr(signal, 'SIGALRM'):
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.alarm(timeout)
+    with open(os.path.join(output_dir, f'{name}.log'), 'w') as log, \
+            contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        try:
+            runpy.run_path(script, run_name='__main__')
+        except ScriptTimeout:
+            status, error = 'timeout', f'Stopped after {timeout} s'
+        except SystemExit as e:
+            # sys.exit() and sys.exit(0) are how some scripts end normally
+            if e.code not in (None, 0):
+                status, error = 'failed', f'SystemExit: {e.code}'
+        except BaseException as e:
+            status, error = 'failed', f'{type(e).__name__}: {e}'
+            traceback.print_exc()
+        finally:
+            if timeout and hasattr(signal, 'SIGALRM'):
+                signal.alarm(0)
+
+        # Figures built up to the end (or the failure) are still worth keeping
+        try:
+            save_open_figures()
+        except Exception as e:
+            print(f"Saving the remaining figures failed: {e}")
+
+    return {
+        'script': os.path.basename(script),
+        'status': status,
+        'error': error,
+        'figures': figures,
+        'seconds': round(time.perf_counter() - start, 3)
+    }
+
+
+def _export_worker(task, connection):
+    """Worker process entry point: send the result of export_script back to the parent"""
+    connection.send(export_script(task))
+    connection.close()
+
+
+def export_figures(scripts, output_dir, formats=('png',), dpi=150, workers=None, timeout=600):
+    """Export the figures of every script on a pool of workers, returns the per-script results"""
+    output_dir = os.path.abspath(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    workers = max(1, min(workers or multiprocessing.cpu_count(), len(scripts)))
+    pending = [(os.path.abspath(script), output_dir, tuple(formats), dpi, timeout) for script in scripts]
+    task_count = len(pending)
+
+    results = []
+    running = {}  # process -> (task, receiving end, start time)
+    # One spawned process per script: no shared matplotlib state, and a worker that
+    # crashes or hangs is noticed here instead of stalling the export
+    context = multiprocessing.get_context('spawn')
+    while pending or running:
+        while pending and len(running) < workers:
+            task = pending.pop(0)
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(target=_export_worker, args=(task, sender), daemon=True)
+            process.start()
+            sender.close()
+            running[process] = (task, receiver, time.perf_counter())
+
+        multiprocessing.connection.wait(
+            [receiver for _, receiver, _ in running.values()] + [process.sentinel for process in running],
+            timeout=1.0)
+
+        for process, (task, receiver, started) in list(running.items()):
+            # Checked before polling, so a worker that exited has already sent anything it will send
+            alive = process.is_alive()
+            seconds = round(time.perf_counter() - started, 3)
+            result = None
+            if receiver.poll():
+                try:
+                    result = receiver.recv()
+                except EOFError:
+                    pass
+            if result is None and not alive:
+                result = _failed_result(task, 'crashed', f'Worker exited with code {process.exitcode}', seconds)
+            elif result is None and timeout and seconds > timeout + KILL_GRACE:
+                process.kill()
+                result = _failed_result(task, 'timeout', f'Killed after {seconds:.0f} s', seconds)
+            if result is None:
+                continue
+
+            process.join()
+            receiver.close()
+            del running[process]
+            results.append(result)
+            detail = f"{len(result['figures'])} figures" if result['status'] == 'ok' else result['error']
+            print(f"[{len(results)}/{task_count}] {result['script']}: {result['status']} "
+                  f"({detail}, {result['seconds']:.1f} s)")
+
+    results.sort(key=lambda result: result['script'])
+    with open(os.path.join(output_dir, 'report.json'), 'w') as f:
+        json.dump({'formats': list(formats), 'dpi': dpi, 'scripts': results}, f, indent=2)
+    return results
+
+
+def _failed_result(task, status, error, seconds):
+    """Result for a script whose worker never reported back"""
+    return {
+        'script': os.path.basename(task[0]),
+        'status': status,
+        'error': error,
+        'figures': [],
+        'seconds': seconds
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export the figures of the analysis scripts without a display')
+    parser.add_argument('scripts', nargs='*',
+                        help='Scripts to run (default: every script in this directory that uses matplotlib)')
+    parser.add_argument('--output', '-o', default='./figures', help='Output directory for figures and logs')
+    parser.add_argument('--format', '-f', nargs='+', choices=FIGURE_FORMATS, default=['png'],
+                        help='Figure formats to write')
+    parser.add_argument('--dpi', type=int, default=150, help='Resolution of raster figures')
+    parser.add_argument('--workers', '-w', type=int, help='Parallel worker processes (default: CPU count)')
+    parser.add_argument('--timeout', type=int, default=600, help='Seconds a script may run, 0 for no limit')
+    parser.add_argument('--exclude', nargs='*', default=[], help='Script names to skip')
+    args = parser.parse_args()
+
+    scripts = args.scripts or discover_scripts(os.path.dirname(os.path.abspath(__file__)))
+    scripts = [script for script in scripts if os.path.basename(script) not in args.exclude]
+    if not scripts:
+        print("No scripts to run")
+        return
+
+    print(f"Exporting figures of {len(scripts)} scripts to {os.path.abspath(args.output)}")
+    results = export_figures(scripts, args.output, args.format, args.dpi, args.workers, args.timeout)
+
+    figure_count = sum(len(result['figures']) for result in results)
+    failed = [result['script'] for result in results if result['status'] != 'ok']
+    print(f"Done: {figure_count} figures from {len(results) - len(failed)}/{len(results)} scripts")
+    if failed:
+        print(f"Failed or timed out (see their .log files): {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
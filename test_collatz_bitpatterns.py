@@ -0,0 +1,49 @@
+import random
+
+import numpy as np
+
+from collatz_bitpatterns import COMPILED_MIN_BITS, BitPatternMatcher, PatternScaler, contains_pattern
+
+PATTERNS = ('0', '1', '00', '01', '10', '101', '111', '1001', '0110')
+
+
+def test_zero_is_the_one_bit_string_0():
+    for pattern in PATTERNS:
+        assert contains_pattern(0, pattern) == (pattern in bin(0)[2:])
+    assert contains_pattern(0, '0')
+    assert not contains_pattern(0, '00')
+    assert not contains_pattern(0, '1')
+
+
+def test_match_agrees_with_bin_strings():
+    matcher = BitPatternMatcher(PATTERNS)
+    numbers = list(range(0, 1024)) + [random.getrandbits(random.randint(1, 200)) for _ in range(500)]
+    # Large enough for the compiled shift/AND matcher
+    numbers += [random.getrandbits(COMPILED_MIN_BITS + 64) for _ in range(50)]
+    numbers += [1 << COMPILED_MIN_BITS, (1 << COMPILED_MIN_BITS) - 1, int('10' * COMPILED_MIN_BITS, 2)]
+    for n in numbers:
+        expected = sum(1 << i for i, pattern in enumerate(PATTERNS) if pattern in bin(n)[2:])
+        assert matcher.match(n) == expected, n
+        for pattern in PATTERNS:
+            assert contains_pattern(n, pattern) == (pattern in bin(n)[2:]), (n, pattern)
+
+
+def test_pattern_scaler_matches_sequential_string_checks():
+    factors = {'101': 1.1, '111': 0.9, '1010': 1.05}
+    scaler = PatternScaler(factors)
+    for n in list(range(1, 2000)) + [random.getrandbits(40) for _ in range(2000)]:
+        expected = n
+        for pattern, factor in factors.items():
+            if pattern in bin(expected)[2:]:
+                expected = int(expected * factor)
+        assert scaler.apply(n) == expected, n
+
+
+def test_match_array_agrees_with_match():
+    matcher = BitPatternMatcher(PATTERNS)
+    values = np.array([0, 1, 2, 5, 2**63, 2**64 - 1] + [random.getrandbits(64) for _ in range(500)],
+                      dtype=np.uint64)
+    found = matcher.match_array(values)
+    for row, value in enumerate(values):
+        mask = matcher.match(int(value))
+        assert list(found[row]) == [bool(mask >> i & 1) for i in range(len(PATTERNS))], int(value)